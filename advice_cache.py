@@ -0,0 +1,155 @@
+"""
+Advice Cache Module
+Cache of LLM travel health advice keyed by a normalized travel context, held
+in memory and optionally persisted to SQLite so it is shared across worker
+processes and restarts
+"""
+
+import bisect
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from cache import TTLCache
+from geo_cache import normalize_destination
+
+# Advice is keyed by epi-week, so a week is the longest it can be relevant
+ADVICE_TTL = 7 * 24 * 3600
+ADVICE_MAX_ENTRIES = 10000
+# Entries also held in memory, in front of the persistent backend
+MEMORY_ENTRIES = 1024
+
+# Upper bounds (days) of the trip duration bands
+DURATION_BANDS = (3, 7, 14, 30)
+TEMPERATURE_BAND = 5
+HUMIDITY_BAND = 25
+WET_WEATHER = ('rain', 'drizzle', 'thunderstorm', 'snow')
+
+
+def advice_context(destination: str, travel_date: str, trip_duration: int,
+                   weather_data: Dict, outbreak_data: Dict) -> Tuple:
+    """
+    Normalized travel context advice is cached under
+
+    Args:
+        destination: 'District, State' destination
+        travel_date: ISO travel date; the current week is used if unparseable
+        trip_duration: Trip length in days
+        weather_data: Weather forecast of the destination
+        outbreak_data: Disease outbreak information of the destination
+
+    Returns:
+        Tuple of destination, ISO (year, week), weather bucket, sorted
+        outbreaks and duration band
+    """
+    try:
+        iso = datetime.fromisoformat(str(travel_date)).isocalendar()
+    except ValueError:
+        iso = datetime.now().isocalendar()
+
+    temperature = weather_data.get('temperature')
+    humidity = weather_data.get('humidity')
+    description = str(weather_data.get('description', '')).lower()
+    weather = (
+        int(temperature // TEMPERATURE_BAND) * TEMPERATURE_BAND if temperature is not None else None,
+        int(humidity // HUMIDITY_BAND) * HUMIDITY_BAND if humidity is not None else None,
+        any(word in description for word in WET_WEATHER)
+    )
+
+    outbreaks = outbreak_data.get('active_outbreaks') or outbreak_data.get('alerts') or []
+    outbreaks = tuple(sorted({str(outbreak).strip().lower() for outbreak in outbreaks}))
+
+    return (
+        normalize_destination(destination),
+        (iso[0], iso[1]),
+        weather,
+        outbreaks,
+        bisect.bisect_left(DURATION_BANDS, int(trip_duration))
+    )
+
+
+class AdviceCache:
+    """Generated advice per travel context with a TTL and an entry limit"""
+
+    def __init__(self, path: str = None, ttl: float = ADVICE_TTL,
+                 max_entries: int = ADVICE_MAX_ENTRIES):
+        """
+        Initialize the cache
+
+        Args:
+            path (str, optional): SQLite database persisting the advice; memory
+                only if omitted
+            ttl (float): Seconds advice is reused
+            max_entries (int): Maximum entries persisted; the soonest to expire
+                are dropped first
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.memory = TTLCache(max_entries=min(max_entries, MEMORY_ENTRIES), ttl=ttl)
+        self._db = None
+        self._lock = threading.Lock()
+
+        if self.path:
+            self._db = sqlite3.connect(self.path, timeout=10, check_same_thread=False,
+                                       isolation_level=None)
+            # WAL lets worker processes read while another writes
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute('CREATE TABLE IF NOT EXISTS advice ('
+                             'key TEXT PRIMARY KEY, advice TEXT NOT NULL, expires_at REAL NOT NULL)')
+            self._db.execute('CREATE INDEX IF NOT EXISTS advice_expires_at ON advice (expires_at)')
+
+    def get(self, context: Tuple) -> Optional[Dict]:
+        """Cached advice for a travel context, or None"""
+        key = self._key(context)
+        advice = self.memory.get(key)
+        if advice is not None or self._db is None:
+            return advice
+
+        try:
+            with self._lock:
+                row = self._db.execute('SELECT advice, expires_at FROM advice WHERE key = ?',
+                                       (key,)).fetchone()
+        except sqlite3.Error as e:
+            print(f"Advice cache read error: {e}")
+            return None
+
+        if row is None or row[1] <= time.time():
+            return None
+
+        advice = json.loads(row[0])
+        self.memory.set(key, advice, ttl=row[1] - time.time())
+        return advice
+
+    def set(self, context: Tuple, advice: Dict) -> None:
+        key = self._key(context)
+        self.memory.set(key, advice)
+        if self._db is None:
+            return
+
+        now = time.time()
+        try:
+            with self._lock:
+                self._db.execute('INSERT OR REPLACE INTO advice (key, advice, expires_at) '
+                                 'VALUES (?, ?, ?)', (key, json.dumps(advice), now + self.ttl))
+                self._db.execute('DELETE FROM advice WHERE expires_at <= ?', (now,))
+                self._db.execute('DELETE FROM advice WHERE key IN (SELECT key FROM advice '
+                                 'ORDER BY expires_at DESC LIMIT -1 OFFSET ?)',
+                                 (self.max_entries,))
+        except sqlite3.Error as e:
+            print(f"Advice cache write error: {e}")
+
+    def stats(self) -> Dict:
+        stats = {'memory': self.memory.stats(), 'persisted': None}
+        if self._db is not None:
+            with self._lock:
+                stats['persisted'] = self._db.execute('SELECT COUNT(*) FROM advice').fetchone()[0]
+        return stats
+
+    @staticmethod
+    def _key(context: Tuple) -> str:
+        return hashlib.sha1(json.dumps(context).encode('utf-8')).hexdigest()
@@ -1,10 +1,18 @@
 import os
-import requests
 import openai
 from datetime import datetime, timedelta
 import json
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
-from idsp_integration import IDSPDataService
+from advice_cache import AdviceCache, ADVICE_MAX_ENTRIES, ADVICE_TTL, advice_context
+from cache import TTLCache
+from geo_cache import (GeocodeCache, HOSPITAL_TTL, PLACE_DETAILS_TTL, WEATHER_TTL,
+                       cell_center, district_destinations, grid_cell, weather_key)
+from http_client import HTTPClient
+from idsp_integration import IDSPDataService, STATE_DISTRICTS
+from surveillance_store import SurveillanceCache, SurveillanceStore
+from request_context import request_scope
+from singleflight import SingleFlight
 
 class APIServices:
     def __init__(self):
@@ -15,20 +23,62 @@ class APIServices:
         self.openweather_api_key = os.getenv('OPENWEATHER_API_KEY')
         self.idsp_api_url = os.getenv('IDSP_API_URL')
         self.idsp_api_key = os.getenv('IDSP_API_KEY')
+        self.idsp_store_dir = os.getenv('IDSP_STORE_DIR')
+        self.idsp_cache_dir = os.getenv('IDSP_CACHE_DIR')
+        
+        # Destination coordinates never change; forecasts follow the upstream's 3h cycle
+        self.geocode_cache = GeocodeCache(os.getenv('GEOCODE_CACHE_PATH'))
+        self.weather_cache = TTLCache(max_entries=1024,
+                                      ttl=float(os.getenv('WEATHER_CACHE_TTL', WEATHER_TTL)))
+        
+        # Nearby hospitals per grid cell and radius, place details per place_id
+        self.hospital_cache = TTLCache(max_entries=2048,
+                                       ttl=float(os.getenv('HOSPITAL_CACHE_TTL', HOSPITAL_TTL)))
+        self.place_details_cache = TTLCache(max_entries=8192, ttl=PLACE_DETAILS_TTL)
+        # Bounded pool shared by all requests for concurrent place details lookups
+        self.place_details_pool = ThreadPoolExecutor(
+            max_workers=int(os.getenv('PLACE_DETAILS_WORKERS', 8)),
+            thread_name_prefix='place-details'
+        )
         
         # Initialize OpenAI client
         if self.openai_api_key:
             openai.api_key = self.openai_api_key
         
+        # Generated advice per normalized travel context; identical contexts
+        # requested concurrently share one generation
+        self.advice_cache = AdviceCache(
+            path=os.getenv('ADVICE_CACHE_PATH'),
+            ttl=float(os.getenv('ADVICE_CACHE_TTL', ADVICE_TTL)),
+            max_entries=int(os.getenv('ADVICE_CACHE_ENTRIES', ADVICE_MAX_ENTRIES))
+        )
+        self.advice_inflight = SingleFlight()
+        
+        # Outbound calls share per-upstream timeouts, retries and circuit breakers
+        self.http = HTTPClient()
+        
         # Initialize IDSP service
         self.idsp_service = IDSPDataService(
             api_key=self.idsp_api_key,
-            base_url=self.idsp_api_url
+            base_url=self.idsp_api_url,
+            http=self.http,
+            store=SurveillanceStore(self.idsp_store_dir) if self.idsp_store_dir else None,
+            cache=SurveillanceCache(
+                cache_dir=self.idsp_cache_dir,
+                open_ttl=float(os.getenv('IDSP_OPEN_WEEK_TTL', 900))
+            )
         )
 
     def get_travel_health_recommendations(self, current_location: str, destination: str, 
                                         travel_date: str, trip_duration: int = 7) -> Dict:
         """Get comprehensive travel health recommendations using OpenAI and other APIs"""
+        # Upstream calls repeated while building the response are made once
+        with request_scope():
+            return self._get_travel_health_recommendations(current_location, destination,
+                                                           travel_date, trip_duration)
+
+    def _get_travel_health_recommendations(self, current_location: str, destination: str,
+                                           travel_date: str, trip_duration: int) -> Dict:
         try:
             # Get weather data for destination
             weather_data = self.get_weather_forecast(destination)
@@ -37,7 +87,7 @@ class APIServices:
             outbreak_data = self.get_disease_outbreaks(destination)
             
             # Generate AI-powered health recommendations using Gemini
-            ai_recommendations = self.generate_ai_health_advice_gemini(
+            ai_recommendations = self.get_ai_health_advice(
                 current_location, destination, travel_date, trip_duration, 
                 weather_data, outbreak_data
             )
@@ -60,10 +110,40 @@ class APIServices:
                 'risks': self.get_fallback_travel_data(destination)
             }
 
+    def get_ai_health_advice(self, current_location: str, destination: str,
+                             travel_date: str, trip_duration: int,
+                             weather_data: Dict, outbreak_data: Dict) -> Dict:
+        """AI health advice for the travel context, generated once per normalized context"""
+        context = advice_context(destination, travel_date, trip_duration,
+                                 weather_data, outbreak_data)
+        advice = self.advice_cache.get(context)
+        if advice is not None:
+            return advice
+        
+        return self.advice_inflight.do(
+            context, self._generate_and_cache_advice, context, current_location,
+            destination, travel_date, trip_duration, weather_data, outbreak_data
+        )
+
+    def _generate_and_cache_advice(self, context: tuple, current_location: str,
+                                   destination: str, travel_date: str, trip_duration: int,
+                                   weather_data: Dict, outbreak_data: Dict) -> Dict:
+        advice = self.generate_ai_health_advice_gemini(
+            current_location, destination, travel_date, trip_duration,
+            weather_data, outbreak_data
+        )
+        # Static fallback advice is not worth keeping in place of a real answer
+        if advice != self.get_fallback_travel_data(destination):
+            self.advice_cache.set(context, advice)
+        return advice
+
     def generate_ai_health_advice_gemini(self, current_location: str, destination: str, 
                                 travel_date: str, trip_duration: int, 
                                 weather_data: Dict, outbreak_data: Dict) -> Dict:
         """Use Gemini AI to generate personalized travel health advice"""
+        if not self.http.available('gemini'):
+            return self.generate_ai_health_advice(current_location, destination, travel_date, trip_duration, weather_data, outbreak_data)
+        
         try:
             prompt = f"""
             Generate travel health recommendations for:
@@ -91,7 +171,8 @@ class APIServices:
             }}
             """
             
-            response = requests.post(
+            response = self.http.post(
+                'gemini',
                 f'https://generativelanguage.googleapis.com/v1beta/models/gemini-pro:generateContent?key={self.gemini_api_key}',
                 headers={'Content-Type': 'application/json'},
                 json={
@@ -178,27 +259,23 @@ class APIServices:
 
     def get_weather_forecast(self, destination: str) -> Dict:
         """Get weather forecast for destination using OpenWeatherMap API"""
-        if not self.openweather_api_key:
+        if not self.openweather_api_key or not self.http.available('openweather'):
             return self.get_mock_weather_data(destination)
         
         try:
             # Get coordinates for destination
-            geocoding_url = f"http://api.openweathermap.org/geo/1.0/direct"
-            geocoding_params = {
-                'q': destination,
-                'limit': 1,
-                'appid': self.openweather_api_key
-            }
-            
-            geo_response = requests.get(geocoding_url, params=geocoding_params)
-            geo_data = geo_response.json()
-            
-            if not geo_data:
+            coords = self.geocode(destination)
+            if coords is None:
                 return self.get_mock_weather_data(destination)
             
-            lat, lon = geo_data[0]['lat'], geo_data[0]['lon']
+            lat, lon = coords
+            key = weather_key(lat, lon)
+            weather = self.weather_cache.get(key)
+            if weather is not None:
+                return weather
             
-            # Get weather forecast
+            # Get weather forecast for the rounded coordinates, shared by nearby destinations
+            lat, lon = key
             weather_url = f"http://api.openweathermap.org/data/2.5/forecast"
             weather_params = {
                 'lat': lat,
@@ -207,30 +284,82 @@ class APIServices:
                 'units': 'metric'
             }
             
-            weather_response = requests.get(weather_url, params=weather_params)
+            weather_response = self.http.get('openweather', weather_url, params=weather_params)
             weather_data = weather_response.json()
             
-            return {
+            weather = {
                 'temperature': weather_data['list'][0]['main']['temp'],
                 'humidity': weather_data['list'][0]['main']['humidity'],
                 'description': weather_data['list'][0]['weather'][0]['description'],
                 'forecast': weather_data['list'][:5]  # 5-day forecast
             }
+            self.weather_cache.set(key, weather)
+            return weather
             
         except Exception as e:
             print(f"Weather API error: {e}")
             return self.get_mock_weather_data(destination)
 
+    def geocode(self, destination: str) -> Optional[tuple]:
+        """(lat, lon) of a destination, from the geocode cache or OpenWeather geocoding"""
+        coords = self.geocode_cache.get(destination)
+        if coords is not None:
+            return coords
+        
+        geocoding_url = f"http://api.openweathermap.org/geo/1.0/direct"
+        geocoding_params = {
+            'q': destination,
+            'limit': 1,
+            'appid': self.openweather_api_key
+        }
+        
+        geo_response = self.http.get('openweather', geocoding_url, params=geocoding_params)
+        geo_data = geo_response.json()
+        
+        if not geo_data:
+            return None
+        
+        coords = (geo_data[0]['lat'], geo_data[0]['lon'])
+        self.geocode_cache.set(destination, *coords)
+        return coords
+
+    def seed_geocode_cache(self, destinations: List[str] = None) -> int:
+        """
+        Geocode destinations missing from the geocode cache
+        
+        Args:
+            destinations: Destinations to seed (default: every supported district)
+        
+        Returns:
+            int: Number of destinations added
+        """
+        if not self.openweather_api_key:
+            return 0
+        
+        added = 0
+        for destination in self.geocode_cache.missing(
+                destinations or district_destinations(STATE_DISTRICTS)):
+            if not self.http.available('openweather'):
+                break
+            try:
+                if self.geocode(destination) is not None:
+                    added += 1
+            except Exception as e:
+                print(f"Geocoding error for {destination}: {e}")
+        
+        return added
+
     def get_disease_outbreaks(self, destination: str) -> Dict:
         """Get current disease outbreak information from IDSP live weekly data"""
         try:
             # Use IDSP service for real government surveillance data
             state = self.map_destination_to_state(destination)
-            idsp_data = self.idsp_service.format_for_travel_health(state)
-            
-            # Get detailed surveillance data
-            surveillance_data = self.idsp_service.get_weekly_surveillance_data(state=state)
-            alerts = self.idsp_service.get_disease_alerts(state=state)
+            with request_scope():
+                idsp_data = self.idsp_service.format_for_travel_health(state)
+                
+                # Get detailed surveillance data; answered from the calls above
+                surveillance_data = self.idsp_service.get_weekly_surveillance_data(state=state)
+                alerts = self.idsp_service.get_disease_alerts(state=state)
             
             return {
                 'active_outbreaks': idsp_data['high_risk_diseases'] + idsp_data['medium_risk_diseases'],
@@ -257,8 +386,7 @@ class APIServices:
             }
             
             # Get current week's surveillance data
-            current_week = datetime.now().isocalendar()[1]
-            current_year = datetime.now().year
+            current_year, current_week = datetime.now().isocalendar()[:2]
             
             # IDSP API call for weekly disease surveillance
             url = f"{self.idsp_api_url}weekly-surveillance"
@@ -269,7 +397,7 @@ class APIServices:
                 'format': 'json'
             }
             
-            response = requests.get(url, headers=headers, params=params)
+            response = self.http.get('idsp', url, headers=headers, params=params)
             
             if response.status_code == 200:
                 data = response.json()
@@ -288,42 +416,10 @@ class APIServices:
             district, state = destination.split(', ')
             return state.strip()
         
-        # District mappings for all three states
-        up_districts = [
-            'Agra', 'Aligarh', 'Ambedkar Nagar', 'Amethi', 'Amroha', 'Auraiya', 'Ayodhya', 'Azamgarh',
-            'Baghpat', 'Bahraich', 'Ballia', 'Balrampur', 'Banda', 'Barabanki', 'Bareilly', 'Basti',
-            'Bhadohi', 'Bijnor', 'Budaun', 'Bulandshahr', 'Chandauli', 'Chitrakoot', 'Deoria', 'Etah',
-            'Etawah', 'Farrukhabad', 'Fatehpur', 'Firozabad', 'Gautam Buddha Nagar', 'Ghaziabad',
-            'Ghazipur', 'Gonda', 'Gorakhpur', 'Hamirpur', 'Hapur', 'Hardoi', 'Hathras', 'Jalaun',
-            'Jaunpur', 'Jhansi', 'Kannauj', 'Kanpur Dehat', 'Kanpur Nagar', 'Kasganj', 'Kaushambi',
-            'Kheri', 'Kushinagar', 'Lalitpur', 'Lucknow', 'Maharajganj', 'Mahoba', 'Mainpuri',
-            'Mathura', 'Mau', 'Meerut', 'Mirzapur', 'Moradabad', 'Muzaffarnagar', 'Pilibhit',
-            'Pratapgarh', 'Prayagraj', 'Raebareli', 'Rampur', 'Saharanpur', 'Sambhal', 'Sant Kabir Nagar',
-            'Shahjahanpur', 'Shamli', 'Shravasti', 'Siddharthnagar', 'Sitapur', 'Sonbhadra',
-            'Sultanpur', 'Unnao', 'Varanasi'
-        ]
-        
-        bihar_districts = [
-            'Araria', 'Arwal', 'Aurangabad', 'Banka', 'Begusarai', 'Bhagalpur', 'Bhojpur', 'Buxar',
-            'Darbhanga', 'East Champaran', 'Gaya', 'Gopalganj', 'Jamui', 'Jehanabad', 'Kaimur',
-            'Katihar', 'Khagaria', 'Kishanganj', 'Lakhisarai', 'Madhepura', 'Madhubani', 'Munger',
-            'Muzaffarpur', 'Nalanda', 'Nawada', 'Patna', 'Purnia', 'Rohtas', 'Saharsa', 'Samastipur',
-            'Saran', 'Sheikhpura', 'Sheohar', 'Sitamarhi', 'Siwan', 'Supaul', 'Vaishali', 'West Champaran'
-        ]
-        
-        wb_districts = [
-            'Alipurduar', 'Bankura', 'Birbhum', 'Cooch Behar', 'Dakshin Dinajpur', 'Darjeeling',
-            'Hooghly', 'Howrah', 'Jalpaiguri', 'Jhargram', 'Kalimpong', 'Kolkata', 'Malda',
-            'Murshidabad', 'Nadia', 'North 24 Parganas', 'Paschim Bardhaman', 'Paschim Medinipur',
-            'Purba Bardhaman', 'Purba Medinipur', 'Purulia', 'South 24 Parganas', 'Uttar Dinajpur'
-        ]
-        
-        if destination in up_districts:
-            return 'Uttar Pradesh'
-        elif destination in bihar_districts:
-            return 'Bihar'
-        elif destination in wb_districts:
-            return 'West Bengal'
+        # Districts of every supported state, shared with the forecast hierarchy
+        for state, districts in STATE_DISTRICTS.items():
+            if destination in districts:
+                return state
         
         return 'Uttar Pradesh'  # Default fallback
 
@@ -502,10 +598,17 @@ class APIServices:
 
     def find_nearby_hospitals(self, latitude: float, longitude: float, radius: int = 5000) -> List[Dict]:
         """Find nearby hospitals using Google Places API"""
-        if not self.google_maps_api_key:
+        if not self.google_maps_api_key or not self.http.available('google_places'):
             return self.get_mock_hospital_data()
         
+        # Users in the same grid cell share one search made from the cell's center
+        cell = grid_cell(latitude, longitude, radius)
+        hospitals = self.hospital_cache.get(cell)
+        if hospitals is not None:
+            return hospitals
+        
         try:
+            latitude, longitude = cell_center(cell)
             url = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
             params = {
                 'location': f"{latitude},{longitude}",
@@ -514,12 +617,21 @@ class APIServices:
                 'key': self.google_maps_api_key
             }
             
-            response = requests.get(url, params=params)
+            response = self.http.get('google_places', url, params=params)
             data = response.json()
             
+            # Quota and request errors come back as HTTP 200 without results
+            status = data.get('status')
+            if status not in ('OK', 'ZERO_RESULTS'):
+                print(f"Google Places API error: {status} {data.get('error_message', '')}")
+                return self.get_mock_hospital_data()
+            
+            places = data.get('results', [])[:10]  # Limit to 10 results
+            details = list(self.place_details_pool.map(self.get_place_details,
+                                                       [place['place_id'] for place in places]))
+            
             hospitals = []
-            for place in data.get('results', [])[:10]:  # Limit to 10 results
-                hospital_details = self.get_place_details(place['place_id'])
+            for place, hospital_details in zip(places, details):
                 hospitals.append({
                     'name': place['name'],
                     'address': place.get('vicinity', ''),
@@ -530,6 +642,9 @@ class APIServices:
                     'place_id': place['place_id']
                 })
             
+            # A failed details lookup would otherwise be served for the whole cell
+            if all(details):
+                self.hospital_cache.set(cell, hospitals)
             return hospitals
             
         except Exception as e:
@@ -541,6 +656,13 @@ class APIServices:
         if not self.google_maps_api_key:
             return {}
         
+        details = self.place_details_cache.get(place_id)
+        if details is not None:
+            return details
+        
+        if not self.http.available('google_places'):
+            return {}
+        
         try:
             url = "https://maps.googleapis.com/maps/api/place/details/json"
             params = {
@@ -549,15 +671,21 @@ class APIServices:
                 'key': self.google_maps_api_key
             }
             
-            response = requests.get(url, params=params)
+            response = self.http.get('google_places', url, params=params)
             data = response.json()
             
+            if data.get('status') != 'OK':
+                print(f"Place details API error: {data.get('status')} {data.get('error_message', '')}")
+                return {}
+            
             result = data.get('result', {})
-            return {
+            details = {
                 'phone': result.get('formatted_phone_number', ''),
                 'website': result.get('website', ''),
                 'hours': result.get('opening_hours', {}).get('weekday_text', [])
             }
+            self.place_details_cache.set(place_id, details)
+            return details
             
         except Exception as e:
             print(f"Place details API error: {e}")
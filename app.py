@@ -1,14 +1,54 @@
 from flask import Flask, render_template, jsonify, request
 from data_collector import DataCollector
+from cache import TTLCache
+from series_store import SeriesStore
 from forecast_model import DiseaseForecaster
+from model_registry import ModelRegistry
+from forecast_store import ForecastStore, ForecastScheduler
+from tuning import TunedParamsStore
+from hierarchy import Hierarchy, LEVELS, RECONCILIATION_METHODS
+from idsp_integration import STATE_DISTRICTS
+from serializers import negotiate_format, forecast_response, batch_response
 import os
 from datetime import datetime, timedelta
 
 app = Flask(__name__)
 
 # Initialize components
-data_collector = DataCollector()
-forecaster = DiseaseForecaster()
+data_collector = DataCollector(cache=TTLCache(
+    max_entries=int(os.getenv('DATA_CACHE_ENTRIES', 128)),
+    max_bytes=int(os.getenv('DATA_CACHE_MAX_BYTES', 256 * 1024 * 1024)),
+    ttl=float(os.getenv('DATA_CACHE_TTL', 3600))
+), store=SeriesStore(os.getenv('SERIES_STORE_DIR')) if os.getenv('SERIES_STORE_DIR') else None)
+model_registry = ModelRegistry(
+    max_models=int(os.getenv('MODEL_CACHE_SIZE', 32)),
+    cache_dir=os.getenv('MODEL_CACHE_DIR')
+)
+surveillance_hierarchy = Hierarchy(STATE_DISTRICTS)
+tuned_params = TunedParamsStore(path=os.getenv('TUNED_PARAMS_PATH'))
+forecaster = DiseaseForecaster(registry=model_registry, tuned_params=tuned_params)
+batch_workers = int(os.getenv('FORECAST_BATCH_WORKERS', os.cpu_count() or 1))
+
+# Precomputed forecasts for the known disease/location pairs
+forecast_store = ForecastStore(store_dir=os.getenv('FORECAST_STORE_DIR'))
+forecast_scheduler = ForecastScheduler(
+    forecaster,
+    data_collector,
+    forecast_store,
+    targets=[tuple(target.split(':', 1)) for target in
+             os.getenv('FORECAST_TARGETS', 'influenza:US,covid-19:US').split(',') if target],
+    interval=float(os.getenv('FORECAST_REFRESH_SECONDS', 6 * 3600)),
+    horizon=int(os.getenv('FORECAST_STORE_HORIZON', 90))
+)
+if os.getenv('FORECAST_SCHEDULER', '1') == '1':
+    forecast_scheduler.start()
+
+def requested_workers(value):
+    """Process count asked for by a client, clamped to the configured pool size"""
+    try:
+        return min(max(int(value), 1), batch_workers)
+    except (TypeError, ValueError):
+        return batch_workers
 
 @app.route('/')
 def index():
@@ -19,19 +59,241 @@ def get_forecast():
     disease = request.args.get('disease', 'influenza')
     location = request.args.get('location', 'US')
     days = int(request.args.get('days', 30))
+    level = request.args.get('level')
+    # Hierarchical requests fit one base model per node, so default to the fast engine
+    engine = request.args.get('engine', 'fast' if level else 'prophet')
+    interval_mode = request.args.get('interval_mode', 'full')
+    interval_samples = request.args.get('interval_samples', type=int)
+    
+    try:
+        fmt = negotiate_format(request)
+        forecaster.get_engine(engine)
+        forecaster.check_interval_mode(interval_mode)
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    
+    if level:
+        return get_hierarchical_forecast(disease, location, level, days, engine,
+                                         interval_mode, fmt)
+    
+    try:
+        stored = forecast_store.get(disease, location)
+        
+        # Stored forecasts carry the forecaster's default intervals, which can
+        # also be dropped for interval_mode=none; other modes are computed
+        if (stored and stored['engine'] == engine and stored['horizon'] >= days
+                and interval_mode in (forecaster.interval_mode, 'none')):
+            # Serve the precomputed forecast, trimmed to the requested horizon
+            forecast = stored['forecast']
+            forecast = forecast[forecast['date'] <= stored['data_as_of'] + timedelta(days=days)]
+            if interval_mode == 'none':
+                forecast = forecast.assign(lower_bound=None, upper_bound=None)
+            source = 'store'
+            generated_at = stored['generated_at']
+            data_as_of = stored['data_as_of']
+        else:
+            # Get historical data
+            historical_data = data_collector.get_historical_data(disease, location)
+            
+            # Generate forecast
+            forecast = forecaster.forecast(historical_data, days=days,
+                                           disease=disease, location=location,
+                                           engine=engine, interval_mode=interval_mode,
+                                           interval_samples=interval_samples)
+            source = 'computed'
+            generated_at = datetime.now()
+            data_as_of = historical_data['date'].max()
+        
+        return forecast_response({
+            'status': 'success',
+            'disease': disease,
+            'location': location,
+            'engine': engine,
+            'interval_mode': interval_mode,
+            'source': source,
+            'generated_at': generated_at.isoformat(),
+            'data_as_of': data_as_of.isoformat()
+        }, forecast, fmt)
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+def get_hierarchical_forecast(disease, location, level, days, engine, interval_mode, fmt='records'):
+    method = request.args.get('reconcile', 'mint')
+    
+    if level not in LEVELS:
+        return jsonify({
+            'status': 'error',
+            'message': f"Unknown level '{level}', expected one of: {', '.join(LEVELS)}"
+        }), 400
+    
+    if method not in RECONCILIATION_METHODS:
+        return jsonify({
+            'status': 'error',
+            'message': f"Unknown reconciliation method '{method}', "
+                       f"expected one of: {', '.join(RECONCILIATION_METHODS)}"
+        }), 400
+    
+    if level == 'national':
+        location = surveillance_hierarchy.national
+    try:
+        hierarchy = surveillance_hierarchy.subtree(level, location)
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    
+    try:
+        # Fit the district series and reconcile them with their state (and nation)
+        bottom_data = {
+            district: data_collector.get_historical_data(disease, district)
+            for _, district in hierarchy.bottom
+        }
+        forecasts = forecaster.forecast_hierarchy(
+            bottom_data, hierarchy, days=days, method=method, disease=disease,
+            engine=engine, interval_mode=interval_mode, max_workers=batch_workers
+        )
+        forecast = forecasts[(level, location)]
+        
+        return forecast_response({
+            'status': 'success',
+            'disease': disease,
+            'location': location,
+            'level': level,
+            'reconciliation': method,
+            'engine': engine,
+            'interval_mode': interval_mode,
+            'source': 'computed',
+            'generated_at': datetime.now().isoformat(),
+            'data_as_of': forecast.loc[forecast['actual_cases'].notna(), 'date'].max().isoformat()
+        }, forecast, fmt)
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@app.route('/api/forecast/intervals', methods=['GET'])
+def get_forecast_intervals():
+    # Second-stage request for clients that first fetched point forecasts with
+    # interval_mode=none; the fitted model is reused from the registry
+    disease = request.args.get('disease', 'influenza')
+    location = request.args.get('location', 'US')
+    days = int(request.args.get('days', 30))
+    engine = request.args.get('engine', 'prophet')
+    interval_mode = request.args.get('interval_mode', 'full')
+    interval_samples = request.args.get('interval_samples', type=int)
+    
+    try:
+        fmt = negotiate_format(request)
+        forecaster.get_engine(engine)
+        forecaster.check_interval_mode(interval_mode)
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
     
     try:
-        # Get historical data
         historical_data = data_collector.get_historical_data(disease, location)
+        forecast = forecaster.forecast(historical_data, days=days,
+                                       disease=disease, location=location,
+                                       engine=engine, interval_mode=interval_mode,
+                                       interval_samples=interval_samples)
         
-        # Generate forecast
-        forecast = forecaster.forecast(historical_data, days=days)
+        return forecast_response({
+            'status': 'success',
+            'disease': disease,
+            'location': location,
+            'engine': engine,
+            'interval_mode': interval_mode
+        }, forecast[['date', 'lower_bound', 'upper_bound']], fmt, key='intervals')
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@app.route('/api/forecast/batch', methods=['POST'])
+def get_forecast_batch():
+    payload = request.get_json(silent=True) or {}
+    series = payload.get('series', [])
+    max_workers = requested_workers(payload.get('max_workers'))
+    engine = payload.get('engine', 'prophet')
+    interval_mode = payload.get('interval_mode', 'full')
+    interval_samples = payload.get('interval_samples')
+    
+    try:
+        fmt = negotiate_format(request)
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    
+    if not isinstance(series, list) or not series:
+        return jsonify({
+            'status': 'error',
+            'message': "Request body must contain a non-empty 'series' list"
+        }), 400
+    
+    specs = []
+    results = [None] * len(series)
+    for i, item in enumerate(series):
+        disease = item.get('disease', 'influenza')
+        location = item.get('location', 'US')
+        try:
+            specs.append((i, {
+                'disease': disease,
+                'location': location,
+                'days': int(item.get('days', 30)),
+                'data': data_collector.get_historical_data(disease, location)
+            }))
+        except Exception as e:
+            results[i] = {
+                'status': 'error',
+                'disease': disease,
+                'location': location,
+                'message': str(e)
+            }
+    
+    try:
+        batch = forecaster.forecast_batch([spec for _, spec in specs],
+                                          max_workers=max_workers, engine=engine,
+                                          interval_mode=interval_mode,
+                                          interval_samples=interval_samples)
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    for (i, _), result in zip(specs, batch):
+        results[i] = result
+    
+    return batch_response({
+        'status': 'success',
+        'engine': engine,
+        'interval_mode': interval_mode,
+        'failed': sum(1 for r in results if r['status'] == 'error')
+    }, results, fmt)
+
+@app.route('/api/forecast/tune', methods=['POST'])
+def tune_forecast():
+    payload = request.get_json(silent=True) or {}
+    disease = payload.get('disease', 'influenza')
+    location = payload.get('location', 'US')
+    
+    try:
+        historical_data = data_collector.get_historical_data(disease, location)
+        best, results = forecaster.tune(
+            historical_data,
+            disease=disease,
+            location=location,
+            n_iter=payload.get('n_iter'),
+            metric=payload.get('metric', 'rmse'),
+            horizon_days=int(payload.get('horizon_days', 30)),
+            max_workers=requested_workers(payload.get('max_workers')),
+            force=bool(payload.get('force', False))
+        )
         
         return jsonify({
             'status': 'success',
             'disease': disease,
             'location': location,
-            'forecast': forecast.to_dict('records')
+            'params': best,
+            'cached': results is None,
+            'candidates': results.to_dict('records') if results is not None else []
         })
     except Exception as e:
         return jsonify({
@@ -39,5 +301,29 @@ def get_forecast():
             'message': str(e)
         }), 500
 
+@app.route('/api/forecast/refresh', methods=['POST'])
+def refresh_forecasts():
+    # Called after a data sync so stored forecasts are recomputed right away
+    forecast_scheduler.trigger()
+    return jsonify({
+        'status': 'success',
+        'targets': [{'disease': d, 'location': l} for d, l in forecast_scheduler.targets]
+    }), 202
+
+@app.route('/api/cache/stats', methods=['GET'])
+def get_cache_stats():
+    return jsonify({
+        'status': 'success',
+        'data': data_collector.cache.stats(),
+        'ranges': data_collector.ranges.stats(),
+        'models': {'entries': len(model_registry), 'max_entries': model_registry.max_models}
+    })
+
+@app.route('/api/cache/invalidate', methods=['POST'])
+def invalidate_cache():
+    payload = request.get_json(silent=True) or {}
+    dropped = data_collector.invalidate(payload.get('disease'), payload.get('location'))
+    return jsonify({'status': 'success', 'invalidated': dropped})
+
 if __name__ == '__main__':
     app.run(debug=True)
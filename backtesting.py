@@ -0,0 +1,136 @@
+"""
+Backtesting Module
+Rolling-origin evaluation of forecasting models with folds fitted in parallel
+"""
+
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from prophet import Prophet
+from sklearn.metrics import mean_absolute_error, mean_squared_error
+
+logger = logging.getLogger(__name__)
+
+
+def generate_cutoffs(dates, horizon, period, initial):
+    """
+    Generate rolling-origin cutoff dates
+
+    Args:
+        dates (pd.Series): Dates of the historical series
+        horizon (pd.Timedelta): Length of each evaluation window
+        period (pd.Timedelta): Spacing between consecutive cutoffs
+        initial (pd.Timedelta): Minimum amount of history before the first cutoff
+
+    Returns:
+        list: Cutoff timestamps in ascending order
+    """
+    start, end = dates.min(), dates.max()
+    cutoff = end - horizon
+    cutoffs = []
+
+    while cutoff >= start + initial:
+        cutoffs.append(cutoff)
+        cutoff -= period
+
+    if not cutoffs:
+        raise ValueError(
+            f"Not enough history for backtesting: need at least {initial + horizon} "
+            f"of data, got {end - start}"
+        )
+
+    return sorted(cutoffs)
+
+
+def score_forecast(actual, predicted):
+    """
+    Compute accuracy metrics for one evaluation window
+
+    Args:
+        actual (array-like): Observed values
+        predicted (array-like): Forecast values
+
+    Returns:
+        dict: MAE, RMSE and MAPE (MAPE ignores zero actuals)
+    """
+    actual = np.asarray(actual, dtype=float)
+    predicted = np.asarray(predicted, dtype=float)
+    nonzero = actual != 0
+
+    return {
+        'mae': mean_absolute_error(actual, predicted),
+        'rmse': float(np.sqrt(mean_squared_error(actual, predicted))),
+        'mape': float(np.mean(np.abs((actual[nonzero] - predicted[nonzero]) / actual[nonzero])) * 100)
+                if nonzero.any() else np.nan
+    }
+
+
+def run_fold(model_params, prophet_data, cutoff, horizon):
+    """
+    Fit on data up to a cutoff and score the following horizon
+
+    Args:
+        model_params (dict): Parameters for the Prophet model
+        prophet_data (pd.DataFrame): Full series with 'ds' and 'y' columns
+        cutoff (pd.Timestamp): Last date included in training
+        horizon (pd.Timedelta): Length of the evaluation window
+
+    Returns:
+        dict: Fold description and metrics
+    """
+    train = prophet_data[prophet_data['ds'] <= cutoff]
+    test = prophet_data[(prophet_data['ds'] > cutoff) & (prophet_data['ds'] <= cutoff + horizon)]
+
+    model = Prophet(**model_params)
+    model.fit(train)
+    predicted = model.predict(test[['ds']])['yhat'].values
+
+    return {
+        'cutoff': cutoff,
+        'train_start': train['ds'].min(),
+        'train_size': len(train),
+        'test_size': len(test),
+        **score_forecast(test['y'].values, predicted)
+    }
+
+
+def backtest(prophet_data, model_params, horizon='30 days', period=None,
+             initial=None, max_workers=None):
+    """
+    Rolling-origin backtest of a Prophet configuration
+
+    Args:
+        prophet_data (pd.DataFrame): Series with 'ds' and 'y' columns
+        model_params (dict): Parameters for the Prophet model
+        horizon (str): Length of each evaluation window, e.g. '30 days'
+        period (str, optional): Spacing between cutoffs (default: horizon)
+        initial (str, optional): Minimum training history (default: 3 * horizon)
+        max_workers (int, optional): Processes used to fit folds; 1 runs inline
+
+    Returns:
+        tuple: (per-fold metrics DataFrame, aggregated metrics DataFrame)
+    """
+    horizon = pd.Timedelta(horizon)
+    period = pd.Timedelta(period) if period else horizon
+    initial = pd.Timedelta(initial) if initial else 3 * horizon
+
+    cutoffs = generate_cutoffs(prophet_data['ds'], horizon, period, initial)
+    logger.info(f"Backtesting over {len(cutoffs)} folds")
+
+    if max_workers == 1:
+        folds = [run_fold(model_params, prophet_data, cutoff, horizon) for cutoff in cutoffs]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(run_fold, model_params, prophet_data, cutoff, horizon)
+                for cutoff in cutoffs
+            ]
+            folds = [future.result() for future in futures]
+
+    folds = pd.DataFrame(folds)
+    summary = folds[['mae', 'rmse', 'mape']].agg(['mean', 'std', 'min', 'max']).T
+    summary['folds'] = len(folds)
+
+    return folds, summary
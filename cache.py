@@ -0,0 +1,320 @@
+"""
+Cache Module
+Thread-safe in-memory cache with an entry and byte budget, LRU eviction,
+per-entry TTL, explicit invalidation and hit/miss/eviction counters, and an
+interval-aware layer that serves date subranges from cached supersets
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+import numpy as np
+import pandas as pd
+
+_MISSING = object()
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate memory footprint of a cached value in bytes"""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(usage, pd.Series) else usage)
+    if hasattr(value, 'nbytes'):
+        return int(value.nbytes)
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v)
+                                          for k, v in value.items())
+    return sys.getsizeof(value)
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries expire after a time-to-live"""
+
+    def __init__(self, max_entries: int = 128, max_bytes: Optional[int] = None,
+                 ttl: Optional[float] = 3600, sizeof: Callable[[Any], int] = estimate_size):
+        """
+        Initialize the cache
+
+        Args:
+            max_entries: Maximum number of entries kept
+            max_bytes: Maximum estimated size of all entries, unbounded if None
+            ttl: Default seconds an entry stays valid, forever if None
+            sizeof: Function estimating the size of a value in bytes
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.sizeof = sizeof
+        # key -> (value, expires_at, size), least recently used first
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for a key, or default if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] is not None and entry[1] <= time.monotonic():
+                self._remove(key)
+                self._expirations += 1
+                entry = None
+
+            if entry is None:
+                self._misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = _MISSING) -> None:
+        """
+        Store a value, evicting least recently used entries to stay in budget
+
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl: Seconds the entry stays valid; the cache default if omitted,
+                forever if None
+        """
+        ttl = self.ttl if ttl is _MISSING else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        size = self.sizeof(value)
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            if self.max_bytes is not None and size > self.max_bytes:
+                # Larger than the whole budget; caching it would flush everything else
+                self._evictions += 1
+                return
+
+            self._entries[key] = (value, expires_at, size)
+            self._bytes += size
+
+            while (len(self._entries) > self.max_entries
+                   or (self.max_bytes is not None and self._bytes > self.max_bytes)):
+                self._remove(next(iter(self._entries)))
+                self._evictions += 1
+
+    def get_or_set(self, key: Hashable, fn: Callable[[], Any],
+                   ttl: Optional[float] = _MISSING) -> Any:
+        """Return the cached value for a key, computing and storing it on a miss"""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = fn()
+            self.set(key, value, ttl)
+        return value
+
+    def invalidate(self, key: Hashable = _MISSING,
+                   predicate: Optional[Callable[[Hashable], bool]] = None) -> int:
+        """
+        Drop entries explicitly
+
+        Args:
+            key: Single key to drop
+            predicate: Drop every key for which this returns True
+
+        Returns:
+            int: Number of entries dropped; everything is dropped if neither
+                key nor predicate is given
+        """
+        with self._lock:
+            if key is not _MISSING:
+                keys = [key] if key in self._entries else []
+            elif predicate is not None:
+                keys = [k for k in self._entries if predicate(k)]
+            else:
+                keys = list(self._entries)
+
+            for k in keys:
+                self._remove(k)
+            self._invalidations += len(keys)
+            return len(keys)
+
+    def clear(self) -> None:
+        self.invalidate()
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters and current usage of the cache"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 4) if lookups else None,
+                'evictions': self._evictions,
+                'expirations': self._expirations,
+                'invalidations': self._invalidations,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'ttl': self.ttl
+            }
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and (entry[1] is None or entry[1] > time.monotonic())
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _remove(self, key: Hashable) -> None:
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+
+class RangeCache:
+    """Date-range segments per series kept in a TTLCache, answering subranges by slicing"""
+
+    def __init__(self, cache: TTLCache, step: pd.Timedelta = pd.Timedelta(days=1),
+                 date_column: str = 'date', slicer: Optional[Callable] = None):
+        """
+        Initialize the range cache
+
+        Args:
+            cache: Cache holding the sorted, disjoint segments of each series
+            step: Spacing of the series; ranges closer than this are adjacent
+            date_column: Column holding the (sorted) dates of cached frames
+            slicer: Called as slicer(segment, start, end) to cut a range out of
+                a cached segment that is not a DataFrame
+        """
+        self.cache = cache
+        self.step = step
+        self.date_column = date_column
+        self.slicer = slicer
+        self._lock = threading.Lock()
+        self._subsumed = 0
+        self._partial = 0
+        self._missed = 0
+        self._gaps_loaded = 0
+
+    def get(self, series: Hashable, start: pd.Timestamp, end: pd.Timestamp,
+            load: Callable[[pd.Timestamp, pd.Timestamp], pd.DataFrame],
+            merge: Optional[Callable[[pd.Timestamp, pd.Timestamp, list], pd.DataFrame]] = None
+            ) -> pd.DataFrame:
+        """
+        Return the rows of a series between start and end (inclusive)
+
+        Args:
+            series: Identity of the series
+            start: First date requested
+            end: Last date requested
+            load: Called as load(gap_start, gap_end) for each uncovered gap
+            merge: Called as merge(start, end, frames) to build a segment spanning
+                overlapping or adjacent frames; concatenates them if omitted
+
+        Returns:
+            pd.DataFrame: Rows of the requested range, sliced from a cached segment
+        """
+        segments = self.cache.get(series) or []
+
+        for seg_start, seg_end, frame in segments:
+            if seg_start <= start and end <= seg_end:
+                self._count(subsumed=1)
+                return self._slice(frame, start, end)
+
+        gaps = missing_ranges([(s, e) for s, e, _ in segments], start, end, self.step)
+        loaded = [(gap_start, gap_end, load(gap_start, gap_end)) for gap_start, gap_end in gaps]
+        self._count(partial=int(bool(segments) and len(gaps) > 0),
+                    missed=int(not segments), gaps_loaded=len(gaps))
+
+        segments = self._merge(segments + loaded, merge)
+        self.cache.set(series, segments)
+
+        for seg_start, seg_end, frame in segments:
+            if seg_start <= start and end <= seg_end:
+                return self._slice(frame, start, end)
+        raise RuntimeError(f"Range {start} - {end} of {series} was not loaded")
+
+    def stats(self) -> Dict[str, int]:
+        """How range lookups were answered"""
+        with self._lock:
+            return {
+                'subsumed': self._subsumed,
+                'partial': self._partial,
+                'missed': self._missed,
+                'gaps_loaded': self._gaps_loaded
+            }
+
+    def _count(self, subsumed=0, partial=0, missed=0, gaps_loaded=0) -> None:
+        with self._lock:
+            self._subsumed += subsumed
+            self._partial += partial
+            self._missed += missed
+            self._gaps_loaded += gaps_loaded
+
+    def _slice(self, frame: pd.DataFrame, start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+        if self.slicer is not None:
+            return self.slicer(frame, start, end)
+
+        # Positional slice of the sorted dates, so the result is a view of the segment
+        dates = frame[self.date_column].to_numpy()
+        lo = dates.searchsorted(np.datetime64(start), side='left')
+        hi = dates.searchsorted(np.datetime64(end), side='right')
+        return frame.iloc[lo:hi].reset_index(drop=True)
+
+    def _merge(self, segments: list, merge) -> list:
+        segments = sorted(segments, key=lambda segment: segment[0])
+        groups = []
+        for segment in segments:
+            if groups and segment[0] <= groups[-1][1] + self.step:
+                groups[-1][1] = max(groups[-1][1], segment[1])
+                groups[-1][2].append(segment[2])
+            else:
+                groups.append([segment[0], segment[1], [segment[2]]])
+
+        merged = []
+        for seg_start, seg_end, frames in groups:
+            if len(frames) == 1:
+                frame = frames[0]
+            elif merge is not None:
+                frame = merge(seg_start, seg_end, frames)
+            else:
+                frame = pd.concat(frames, ignore_index=True)
+                frame = frame.drop_duplicates(self.date_column, keep='last')
+                frame = frame.sort_values(self.date_column, ignore_index=True)
+            merged.append((seg_start, seg_end, frame))
+        return merged
+
+
+def missing_ranges(covered: list, start, end, step) -> list:
+    """
+    Sub-ranges of [start, end] not covered by any of the given ranges
+
+    Args:
+        covered: Inclusive (start, end) ranges, in any order
+        start: First point of the requested range
+        end: Last point of the requested range
+        step: Spacing of the points in the range
+
+    Returns:
+        list: Inclusive (start, end) gaps in ascending order
+    """
+    gaps = []
+    cursor = start
+    for seg_start, seg_end in sorted(covered):
+        if seg_end < cursor:
+            continue
+        if seg_start > end:
+            break
+        if seg_start > cursor:
+            gaps.append((cursor, seg_start - step))
+        cursor = max(cursor, seg_end + step)
+    if cursor <= end:
+        gaps.append((cursor, end))
+    return gaps
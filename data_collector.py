@@ -1,12 +1,48 @@
 import pandas as pd
 import numpy as np
+import zlib
 from datetime import datetime, timedelta
+from functools import lru_cache
 import requests
+from cache import TTLCache, RangeCache, missing_ranges
+from historical_series import HistoricalSeries
+
+# Synthetic series count cases from this year on, so the value of a date does
+# not depend on the range it was requested in and fetched gaps join up
+SYNTHETIC_EPOCH_YEAR = 2000
+
+@lru_cache(maxsize=4096)
+def _synthetic_daily(seed, year):
+    # Daily new cases of one series for a whole year (366 slots), reproducible
+    # in every process
+    if year < SYNTHETIC_EPOCH_YEAR:
+        return np.zeros(366, dtype=np.int64)
+    return np.random.default_rng([seed, year]).poisson(lam=100, size=366)
+
+@lru_cache(maxsize=4096)
+def _synthetic_total_before(seed, year):
+    # Cumulative cases of one series before January 1st of a year
+    if year <= SYNTHETIC_EPOCH_YEAR:
+        return 0
+    previous = year - 1
+    days = 366 if pd.Timestamp(year=previous, month=12, day=31).dayofyear == 366 else 365
+    return _synthetic_total_before(seed, previous) + int(_synthetic_daily(seed, previous)[:days].sum())
 
 class DataCollector:
-    def __init__(self):
+    def __init__(self, cache=None, store=None):
+        """
+        Initialize the data collector
+        
+        Args:
+            cache (TTLCache, optional): Cache for fetched series; a default
+                bounded cache with a one hour TTL is used if omitted
+            store (SeriesStore, optional): On-disk series store; when given, fetched
+                series are persisted and later ranges are read from it
+        """
         # In a production environment, you would load API keys here
-        self.cache = {}
+        self.cache = cache if cache is not None else TTLCache(max_entries=128, ttl=3600)
+        self.ranges = RangeCache(self.cache, slicer=HistoricalSeries.slice)
+        self.store = store
         
     def get_historical_data(self, disease, location, start_date=None, end_date=None):
         """
@@ -19,35 +55,85 @@ class DataCollector:
             end_date (str, optional): End date in YYYY-MM-DD format
             
         Returns:
-            pandas.DataFrame: DataFrame containing historical disease data
+            HistoricalSeries: Daily case counts; indexing it by 'date', 'cases',
+                'deaths' or 'recovered' gives the columns of the former DataFrame
         """
-        # Generate cache key
-        cache_key = f"{disease}_{location}_{start_date}_{end_date}"
+        end_date = pd.Timestamp(end_date or datetime.now()).normalize()
+        start_date = (pd.Timestamp(start_date).normalize() if start_date
+                      else end_date - timedelta(days=365))
         
-        # Return cached data if available
-        if cache_key in self.cache:
-            return self.cache[cache_key]
-            
+        # Cached ranges of the series answer any subrange; only uncovered gaps are loaded
+        if self.store is not None:
+            return self.ranges.get((disease, location), start_date, end_date,
+                                   load=lambda start, end: self._load_stored(disease, location,
+                                                                             start, end),
+                                   merge=lambda start, end, frames: self._load_stored(
+                                       disease, location, start, end))
+        
+        return self.ranges.get((disease, location), start_date, end_date,
+                               load=lambda start, end: self._fetch(disease, location, start, end),
+                               merge=lambda start, end, parts: HistoricalSeries.concat(parts))
+    
+    def _load_stored(self, disease, location, start_date, end_date):
+        # Fetch the parts of the range the store is missing, then serve a
+        # zero-copy slice of the memory-mapped columns
+        coverage = self.store.coverage(disease, location)
+        if coverage is None:
+            gaps = [(start_date, end_date)]
+        else:
+            # The stored series is contiguous, so gaps are bridged up to its edges
+            gaps = missing_ranges([coverage],
+                                  min(start_date, coverage[0]), max(end_date, coverage[1]),
+                                  timedelta(days=1))
+        
+        if gaps:
+            fetched = [self._fetch(disease, location, start, end) for start, end in gaps]
+            self.store.merge(disease, location,
+                             HistoricalSeries.concat(fetched).to_frame(derived=False))
+        
+        return HistoricalSeries.from_frame(self.store.read(disease, location,
+                                                           start_date, end_date))
+    
+    def _fetch(self, disease, location, start_date, end_date):
         # In a real application, this would fetch from a real API
-        # For demonstration, we'll generate synthetic data
-        end_date = end_date or datetime.now().strftime('%Y-%m-%d')
-        start_date = start_date or (datetime.now() - timedelta(days=365)).strftime('%Y-%m-%d')
+        # For demonstration, we'll generate synthetic cumulative counts that are
+        # a fixed function of the date, like an upstream's history would be
+        if end_date < start_date:
+            return HistoricalSeries(start_date, [])
         
-        date_range = pd.date_range(start=start_date, end=end_date, freq='D')
-        cases = np.random.poisson(lam=100, size=len(date_range)).cumsum()
+        seed = zlib.crc32(f"{disease}|{location}".encode('utf-8'))
+        daily = np.concatenate([
+            _synthetic_daily(seed, year)[:pd.Timestamp(year=year, month=12, day=31).dayofyear]
+            for year in range(start_date.year, end_date.year + 1)
+        ])
+        first = start_date.dayofyear - 1
+        daily = daily[first:first + (end_date - start_date).days + 1]
+        offset = (_synthetic_total_before(seed, start_date.year)
+                  + int(_synthetic_daily(seed, start_date.year)[:first].sum()))
+        
+        # Deaths (1%) and recovered (80%) are derived from the cases on access
+        return HistoricalSeries(start_date, offset + daily.cumsum())
+    
+    def invalidate(self, disease=None, location=None):
+        """
+        Drop cached series, e.g. after the upstream data was corrected
         
-        # Create DataFrame with synthetic data
-        data = pd.DataFrame({
-            'date': date_range,
-            'cases': cases,
-            'deaths': (cases * 0.01).astype(int),  # 1% mortality rate
-            'recovered': (cases * 0.8).astype(int)  # 80% recovery rate
-        })
+        With both disease and location given, the series is also removed from
+        the on-disk store so it is fetched again.
         
-        # Cache the data
-        self.cache[cache_key] = data
+        Args:
+            disease (str, optional): Only drop series for this disease
+            location (str, optional): Only drop series for this location
+            
+        Returns:
+            int: Number of cached entries dropped
+        """
+        if self.store is not None and disease is not None and location is not None:
+            self.store.delete(disease, location)
         
-        return data
+        return self.cache.invalidate(predicate=lambda key: (
+            (disease is None or key[0] == disease) and (location is None or key[1] == location)
+        ))
     
     def get_current_weather(self, location):
         """
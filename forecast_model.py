@@ -1,19 +1,232 @@
 import pandas as pd
 import numpy as np
+import copy
+from statistics import NormalDist
 from prophet import Prophet
-from sklearn.metrics import mean_absolute_error, mean_squared_error
+from prophet.serialize import model_from_json, model_to_json
+from concurrent.futures import ProcessPoolExecutor
 import logging
+from backtesting import backtest
+from holt_winters import fit_predict
+from model_registry import ModelRegistry
+from singleflight import SingleFlight
+from historical_series import HistoricalSeries
+from tuning import search
+from hierarchy import reconcile
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+PREDICTION_COLUMNS = ['ds', 'yhat', 'yhat_lower', 'yhat_upper']
+
+# How yhat_lower/yhat_upper are computed:
+#   full     - Prophet's simulation with the model's uncertainty_samples (1000)
+#   sampled  - Prophet's simulation with a reduced number of samples
+#   analytic - closed-form normal approximation of Prophet's uncertainty model
+#   none     - point forecast only, bounds are left empty
+INTERVAL_MODES = ('full', 'sampled', 'analytic', 'none')
+DEFAULT_INTERVAL_SAMPLES = 100
+
+
+class ForecastEngine:
+    """Base class for the forecasting engines DiseaseForecaster can delegate to"""
+    
+    name = None
+    
+    def predict(self, forecaster, prophet_data, days, disease=None, location=None,
+                interval_mode='full', interval_samples=None):
+        """
+        Predict over the history and the forecast horizon
+        
+        Args:
+            forecaster (DiseaseForecaster): Forecaster providing params and model cache
+            prophet_data (pd.DataFrame): Prepared data with 'ds' and 'y' columns
+            days (int): Number of days to forecast
+            disease (str, optional): Disease the series belongs to
+            location (str, optional): Location the series belongs to
+            interval_mode (str): One of INTERVAL_MODES
+            interval_samples (int, optional): Samples used by the 'sampled' mode
+            
+        Returns:
+            pd.DataFrame: 'ds', 'yhat', 'yhat_lower' and 'yhat_upper' columns
+        """
+        raise NotImplementedError
+    
+    def predict_many(self, forecaster, items, max_workers=None):
+        """
+        Predict many series at once
+        
+        Args:
+            forecaster (DiseaseForecaster): Forecaster providing params and model cache
+            items (list): Dicts with 'prophet_data', 'days', 'disease', 'location',
+                'interval_mode' and 'interval_samples'
+            max_workers (int, optional): Parallelism hint for engines that use it
+            
+        Returns:
+            list: A prediction DataFrame or the raised exception for each item
+        """
+        results = []
+        for item in items:
+            try:
+                results.append(self.predict(forecaster, item['prophet_data'], item['days'],
+                                            item.get('disease'), item.get('location'),
+                                            item.get('interval_mode', 'full'),
+                                            item.get('interval_samples')))
+            except Exception as e:
+                results.append(e)
+        return results
+
+
+class ProphetEngine(ForecastEngine):
+    """Prophet models, cached in the forecaster's model registry"""
+    
+    name = 'prophet'
+    
+    def predict(self, forecaster, prophet_data, days, disease=None, location=None,
+                interval_mode='full', interval_samples=None):
+        model = forecaster._get_model(prophet_data, disease, location)
+        return self.predict_model(model, days, interval_mode, interval_samples)
+    
+    @staticmethod
+    def predict_model(model, days, interval_mode='full', interval_samples=None):
+        """Predict the history and the next `days` days with a fitted model"""
+        future = model.make_future_dataframe(periods=days)
+        if interval_mode == 'full':
+            return model.predict(future)[PREDICTION_COLUMNS]
+        
+        # Predict from a shallow copy so the shared cached model is not modified
+        model_copy = copy.copy(model)
+        model_copy.uncertainty_samples = (
+            (interval_samples or DEFAULT_INTERVAL_SAMPLES) if interval_mode == 'sampled' else 0
+        )
+        prediction = model_copy.predict(future, vectorized=True)
+        
+        if interval_mode == 'analytic':
+            prediction['yhat_lower'], prediction['yhat_upper'] = analytic_intervals(model, prediction)
+        elif interval_mode == 'none':
+            prediction['yhat_lower'] = prediction['yhat_upper'] = np.nan
+        
+        return prediction[PREDICTION_COLUMNS]
+    
+    def predict_many(self, forecaster, items, max_workers=None):
+        results = [None] * len(items)
+        pending = {}
+        
+        # Serve registered series in-process, fit the rest in a process pool
+        for i, item in enumerate(items):
+            try:
+                params = forecaster.params_for(item.get('disease'), item.get('location'))
+                key = forecaster.registry.make_key(item.get('disease'), item.get('location'),
+                                                   item['prophet_data'], params)
+                model = forecaster.registry.get(key)
+                if model is not None:
+                    results[i] = self.predict_model(model, item['days'],
+                                                    item.get('interval_mode', 'full'),
+                                                    item.get('interval_samples'))
+                else:
+                    pending[i] = (key, params)
+            except Exception as e:
+                results[i] = e
+        
+        if pending:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = {
+                    i: executor.submit(_fit_and_predict, pending[i][1],
+                                       items[i]['prophet_data'], items[i]['days'],
+                                       forecaster._warm_start(items[i].get('disease'),
+                                                              items[i].get('location')),
+                                       items[i].get('interval_mode', 'full'),
+                                       items[i].get('interval_samples'))
+                    for i in pending
+                }
+                for i, future in futures.items():
+                    try:
+                        prediction, model_json = future.result()
+                        forecaster.registry.put(pending[i][0], model_from_json(model_json))
+                        results[i] = prediction
+                    except Exception as e:
+                        results[i] = e
+        
+        return results
+
+
+class FastEngine(ForecastEngine):
+    """Vectorized NumPy Holt-Winters smoothing for low-latency forecasts"""
+    
+    name = 'fast'
+    
+    def __init__(self, season_length=7, interval_width=0.8):
+        """
+        Initialize the fast engine
+        
+        Args:
+            season_length (int): Observations per seasonal cycle (7 for daily data)
+            interval_width (float): Coverage of the prediction intervals
+        """
+        self.season_length = season_length
+        self.interval_width = interval_width
+    
+    def predict(self, forecaster, prophet_data, days, disease=None, location=None,
+                interval_mode='full', interval_samples=None):
+        result = self.predict_many(forecaster, [{'prophet_data': prophet_data, 'days': days,
+                                                 'interval_mode': interval_mode}])[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+    
+    def predict_many(self, forecaster, items, max_workers=None):
+        results = [None] * len(items)
+        
+        # Series of equal length are stacked and smoothed in a single pass
+        groups = {}
+        for i, item in enumerate(items):
+            groups.setdefault(len(item['prophet_data']), []).append(i)
+        
+        for indices in groups.values():
+            horizon = max(items[i]['days'] for i in indices)
+            try:
+                Y = np.vstack([items[i]['prophet_data']['y'].to_numpy(dtype=float)
+                               for i in indices])
+                predictions = fit_predict(Y, horizon, season_length=self.season_length,
+                                          interval_width=self.interval_width)
+            except Exception as e:
+                for i in indices:
+                    results[i] = e
+                continue
+            
+            for row, i in enumerate(indices):
+                history = items[i]['prophet_data']['ds']
+                days = items[i]['days']
+                end = len(history) + days
+                future = pd.date_range(history.iloc[-1] + pd.Timedelta(days=1), periods=days, freq='D')
+                results[i] = pd.DataFrame({
+                    'ds': np.concatenate([history.to_numpy(), future.to_numpy()]),
+                    **{column: predictions[column][row, :end] for column in PREDICTION_COLUMNS[1:]}
+                })
+                # Intervals are analytic and essentially free; only drop them on request
+                if items[i].get('interval_mode') == 'none':
+                    results[i]['yhat_lower'] = results[i]['yhat_upper'] = np.nan
+        
+        return results
+
+
+ENGINES = {engine.name: engine for engine in (ProphetEngine(), FastEngine())}
+
+
 class DiseaseForecaster:
-    def __init__(self, model_params=None):
+    def __init__(self, model_params=None, registry=None, engine='prophet', interval_mode='full',
+                 tuned_params=None):
         """
         Initialize the disease forecaster
         
         Args:
             model_params (dict, optional): Parameters for the Prophet model
+            registry (ModelRegistry, optional): Cache of fitted models shared
+                between forecasts; a private in-memory registry is used if omitted
+            engine (str): Default forecasting engine, 'prophet' or 'fast'
+            interval_mode (str): Default interval computation, one of INTERVAL_MODES
+            tuned_params (TunedParamsStore, optional): Per-series parameters found by
+                tune(), used instead of model_params for series that were tuned
         """
         self.model_params = model_params or {
             'changepoint_prior_scale': 0.05,
@@ -23,18 +236,66 @@ class DiseaseForecaster:
             'weekly_seasonality': True,
             'daily_seasonality': False
         }
+        self.registry = registry if registry is not None else ModelRegistry()
+        self.engine = self.get_engine(engine)
+        self.interval_mode = self.check_interval_mode(interval_mode)
+        self.tuned_params = tuned_params
+        # Concurrent requests for the same fit wait on the one in progress
+        self.inflight = SingleFlight()
+        # Most recently fitted or loaded model; kept for callers that inspect it,
+        # forecasting itself never reads it so the forecaster can be shared by threads
         self.model = None
     
+    @staticmethod
+    def get_engine(engine):
+        """Resolve an engine name (or instance) to a ForecastEngine"""
+        if isinstance(engine, ForecastEngine):
+            return engine
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown forecasting engine '{engine}', "
+                             f"expected one of: {', '.join(ENGINES)}")
+        return ENGINES[engine]
+    
+    @staticmethod
+    def check_interval_mode(interval_mode):
+        """Validate an interval mode name"""
+        if interval_mode not in INTERVAL_MODES:
+            raise ValueError(f"Unknown interval mode '{interval_mode}', "
+                             f"expected one of: {', '.join(INTERVAL_MODES)}")
+        return interval_mode
+    
+    def params_for(self, disease=None, location=None):
+        """
+        Get the Prophet parameters used for a series
+        
+        Args:
+            disease (str, optional): Disease the series belongs to
+            location (str, optional): Location the series belongs to
+            
+        Returns:
+            dict: Tuned parameters if the series was tuned, else model_params
+        """
+        if self.tuned_params is not None:
+            tuned = self.tuned_params.get(disease, location)
+            if tuned is not None:
+                return {**self.model_params, **tuned}
+        return self.model_params
+    
     def prepare_data(self, data):
         """
         Prepare data for forecasting
         
         Args:
-            data (pd.DataFrame): Historical data with 'date' and 'cases' columns
+            data (pd.DataFrame or HistoricalSeries): Historical data with 'date'
+                and 'cases' columns
             
         Returns:
             pd.DataFrame: Prepared data for Prophet
         """
+        # Compact series are used as they are, without copying the counts
+        if isinstance(data, HistoricalSeries):
+            return data.to_prophet()
+        
         # Ensure we have the required columns
         if 'date' not in data.columns or 'cases' not in data.columns:
             raise ValueError("Input data must contain 'date' and 'cases' columns")
@@ -51,12 +312,14 @@ class DiseaseForecaster:
         
         return prophet_data
     
-    def train(self, data):
+    def train(self, data, disease=None, location=None):
         """
         Train the forecasting model
         
         Args:
             data (pd.DataFrame): Historical data
+            disease (str, optional): Disease the series belongs to
+            location (str, optional): Location the series belongs to
             
         Returns:
             Prophet: Trained Prophet model
@@ -64,34 +327,125 @@ class DiseaseForecaster:
         # Prepare data
         prophet_data = self.prepare_data(data)
         
-        # Initialize and train model
-        self.model = Prophet(**self.model_params)
-        self.model.fit(prophet_data)
+        # Initialize and train model, registering the fit so later forecasts on
+        # the same series reuse it
+        params = self.params_for(disease, location)
+        key = self.registry.make_key(disease, location, prophet_data, params)
+        model = self.inflight.do(key, self._fit_and_register, key, params, prophet_data)
         
-        return self.model
+        self.model = model
+        return model
     
-    def forecast(self, data, days=30):
+    def get_model(self, data, disease=None, location=None):
+        """
+        Get a fitted model for a series, fitting only if it is not registered yet
+        
+        Args:
+            data (pd.DataFrame): Historical data
+            disease (str, optional): Disease the series belongs to
+            location (str, optional): Location the series belongs to
+            
+        Returns:
+            Prophet: Fitted Prophet model
+        """
+        return self._get_model(self.prepare_data(data), disease, location)
+    
+    def _get_model(self, prophet_data, disease=None, location=None):
+        params = self.params_for(disease, location)
+        key = self.registry.make_key(disease, location, prophet_data, params)
+        
+        model = self.registry.get(key)
+        if model is None:
+            model = self.inflight.do(key, self._fit_if_missing, key, params, prophet_data,
+                                     disease, location)
+        
+        self.model = model
+        return model
+    
+    def _fit_if_missing(self, key, params, prophet_data, disease, location):
+        # A fit for this key may have finished between the registry miss and
+        # this call becoming the leader
+        model = self.registry.get(key)
+        if model is None:
+            logger.info(f"Fitting model for {disease}/{location}")
+            model = self._fit_and_register(key, params, prophet_data,
+                                           init=self._warm_start(disease, location))
+        return model
+    
+    def _fit_and_register(self, key, params, prophet_data, init=None):
+        model = _fit_prophet(params, prophet_data, init=init)
+        self.registry.put(key, model)
+        return model
+    
+    def _warm_start(self, disease, location):
+        # Parameters of the previous fit of this series, if there was one
+        previous = self.registry.latest(disease, location, self.params_for(disease, location))
+        return warm_start_params(previous) if previous is not None else None
+    
+    def update(self, new_rows, disease=None, location=None):
+        """
+        Update the model for a series with newly observed rows
+        
+        The previous fit's history is extended with the new rows (rows for dates
+        already in the history replace them) and the model is refitted starting
+        from the previous fit's parameters, which converges much faster than a
+        cold fit.
+        
+        Args:
+            new_rows (pd.DataFrame): New observations with 'date' and 'cases' columns
+            disease (str, optional): Disease the series belongs to
+            location (str, optional): Location the series belongs to
+            
+        Returns:
+            Prophet: Updated Prophet model
+        """
+        params = self.params_for(disease, location)
+        previous = self.registry.latest(disease, location, params)
+        if previous is None:
+            raise ValueError(f"No fitted model for {disease}/{location} to update; "
+                             f"train or forecast the series first")
+        
+        prophet_data = pd.concat([previous.history[['ds', 'y']], self.prepare_data(new_rows)])
+        prophet_data = prophet_data.drop_duplicates('ds', keep='last').sort_values('ds')
+        prophet_data = prophet_data.reset_index(drop=True)
+        
+        key = self.registry.make_key(disease, location, prophet_data, params)
+        model = self.inflight.do(key, self._fit_and_register, key, params, prophet_data,
+                                 init=warm_start_params(previous))
+        
+        self.model = model
+        return model
+    
+    def forecast(self, data, days=30, disease=None, location=None, engine=None,
+                 interval_mode=None, interval_samples=None):
         """
         Generate forecasts
         
         Args:
             data (pd.DataFrame): Historical data
             days (int): Number of days to forecast
+            disease (str, optional): Disease the series belongs to
+            location (str, optional): Location the series belongs to
+            engine (str, optional): Engine override for this call, 'prophet' or 'fast'
+            interval_mode (str, optional): Interval computation override, one of
+                INTERVAL_MODES; 'none' skips interval sampling entirely
+            interval_samples (int, optional): Samples used by the 'sampled' mode
             
         Returns:
             pd.DataFrame: Forecast results with confidence intervals
         """
-        if self.model is None:
-            self.train(data)
-        
-        # Create future dataframe
-        future = self.model.make_future_dataframe(periods=days)
+        engine = self.get_engine(engine) if engine else self.engine
+        interval_mode = self.check_interval_mode(interval_mode or self.interval_mode)
+        prophet_data = self.prepare_data(data)
         
-        # Generate forecast
-        forecast = self.model.predict(future)
+        prediction = engine.predict(self, prophet_data, days, disease, location,
+                                    interval_mode, interval_samples)
         
+        return self._format_forecast(prediction, prophet_data)
+    
+    def _format_forecast(self, prediction, prophet_data):
         # Format output
-        forecast = forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].rename(columns={
+        forecast = prediction[PREDICTION_COLUMNS].rename(columns={
             'ds': 'date',
             'yhat': 'predicted_cases',
             'yhat_lower': 'lower_bound',
@@ -99,9 +453,8 @@ class DiseaseForecaster:
         })
         
         # Add actual values for historical period
-        history = self.prepare_data(data)
         forecast = forecast.merge(
-            history.rename(columns={'y': 'actual_cases'}),
+            prophet_data.rename(columns={'ds': 'date', 'y': 'actual_cases'}),
             on='date',
             how='left'
         )
@@ -112,41 +465,304 @@ class DiseaseForecaster:
         
         return forecast
     
-    def evaluate(self, data, forecast_days=30):
+    def forecast_batch(self, specs, max_workers=None, engine=None, interval_mode=None,
+                       interval_samples=None):
+        """
+        Generate forecasts for many series, fitting uncached series in parallel
+        
+        Args:
+            specs (list): Series specs, each a dict with 'data' and optional
+                'disease', 'location' and 'days' (default 30) keys
+            max_workers (int, optional): Size of the process pool used for fitting
+            engine (str, optional): Engine override for this batch, 'prophet' or 'fast'
+            interval_mode (str, optional): Interval computation override for this batch
+            interval_samples (int, optional): Samples used by the 'sampled' mode
+            
+        Returns:
+            list: One result dict per spec, in input order, with 'status' set to
+                'success' (and a 'forecast' DataFrame) or 'error' (and a 'message')
+        """
+        engine = self.get_engine(engine) if engine else self.engine
+        interval_mode = self.check_interval_mode(interval_mode or self.interval_mode)
+        results = [None] * len(specs)
+        items = {}
+        
+        for i, spec in enumerate(specs):
+            disease = spec.get('disease')
+            location = spec.get('location')
+            results[i] = {'disease': disease, 'location': location}
+            
+            try:
+                items[i] = {
+                    'prophet_data': self.prepare_data(spec['data']),
+                    'days': int(spec.get('days', 30)),
+                    'disease': disease,
+                    'location': location,
+                    'interval_mode': interval_mode,
+                    'interval_samples': interval_samples
+                }
+            except Exception as e:
+                results[i].update({'status': 'error', 'message': str(e)})
+        
+        predictions = engine.predict_many(self, list(items.values()), max_workers=max_workers)
+        
+        for (i, item), prediction in zip(items.items(), predictions):
+            if isinstance(prediction, Exception):
+                logger.warning(f"Batch forecast failed for "
+                               f"{item['disease']}/{item['location']}: {prediction}")
+                results[i].update({'status': 'error', 'message': str(prediction)})
+            else:
+                results[i].update({
+                    'status': 'success',
+                    'forecast': self._format_forecast(prediction, item['prophet_data'])
+                })
+        
+        return results
+    
+    def forecast_hierarchy(self, bottom_data, hierarchy, days=30, method='mint', disease=None,
+                           engine=None, interval_mode=None, max_workers=None):
+        """
+        Generate coherent forecasts for every node of a district/state/national hierarchy
+        
+        District series are summed into state and national series. Base forecasts
+        are produced for the levels the reconciliation method needs (districts only
+        for bottom_up, every level otherwise) and reconciled across all levels and
+        dates in a single matrix product.
+        
+        Args:
+            bottom_data (dict): Historical data per district name
+            hierarchy (Hierarchy): Structure linking districts, states and the nation
+            days (int): Number of days to forecast
+            method (str): Reconciliation method, 'bottom_up', 'ols' or 'mint'
+            disease (str, optional): Disease the series belong to
+            engine (str, optional): Engine override for the base forecasts
+            interval_mode (str, optional): Interval computation for the base forecasts
+            max_workers (int, optional): Processes used to fit base forecasts
+            
+        Returns:
+            dict: Forecast DataFrame per (level, name) node
+        """
+        # Align district series on a shared date index and aggregate upwards
+        bottom = pd.concat(
+            [self.prepare_data(bottom_data[name]).set_index('ds')['y'].rename(name)
+             for _, name in hierarchy.bottom],
+            axis=1
+        ).sort_index().fillna(0)
+        dates = bottom.index
+        Y = hierarchy.S @ bottom.to_numpy(dtype=float).T
+        
+        n_bottom = len(hierarchy.bottom)
+        fitted = range(len(hierarchy.nodes) - n_bottom if method == 'bottom_up' else 0,
+                       len(hierarchy.nodes))
+        specs = [{
+            'data': pd.DataFrame({'date': dates, 'cases': Y[i]}),
+            'disease': disease,
+            'location': f"{hierarchy.nodes[i][0]}:{hierarchy.nodes[i][1]}",
+            'days': days
+        } for i in fitted]
+        
+        results = self.forecast_batch(specs, max_workers=max_workers, engine=engine,
+                                      interval_mode=interval_mode)
+        failed = [spec['location'] for spec, result in zip(specs, results)
+                  if result['status'] == 'error']
+        if failed:
+            raise ValueError(f"Base forecasts failed for: {', '.join(failed)}")
+        
+        # Stack base forecasts as (node, step) matrices
+        steps = len(results[0]['forecast'])
+        base = np.full((len(hierarchy.nodes), steps), np.nan)
+        half_width = np.full((len(hierarchy.nodes), steps), np.nan)
+        variances = np.full(len(hierarchy.nodes), np.nan)
+        for i, result in zip(fitted, results):
+            forecast = result['forecast']
+            base[i] = forecast['predicted_cases'].to_numpy()
+            half_width[i] = (forecast['upper_bound'] - forecast['lower_bound']).to_numpy() / 2
+            variances[i] = np.nanmean(forecast['error'].to_numpy() ** 2)
+        
+        reconciled, _ = reconcile(base, hierarchy.S, method=method, variances=variances)
+        
+        # Bounds: bottom-level widths around the reconciled mean, combined
+        # upwards assuming independent district errors
+        bottom_rows = slice(len(hierarchy.nodes) - n_bottom, None)
+        width = np.sqrt(hierarchy.S @ half_width[bottom_rows] ** 2)
+        
+        forecast_dates = results[0]['forecast']['date']
+        forecasts = {}
+        for i, node in enumerate(hierarchy.nodes):
+            actual = pd.Series(Y[i], index=dates).reindex(forecast_dates).to_numpy()
+            forecasts[node] = pd.DataFrame({
+                'date': forecast_dates.to_numpy(),
+                'predicted_cases': reconciled[i],
+                'lower_bound': reconciled[i] - width[i],
+                'upper_bound': reconciled[i] + width[i],
+                'actual_cases': actual,
+                'error': actual - reconciled[i]
+            })
+        
+        return forecasts
+    
+    def backtest(self, data, horizon_days=30, period_days=None, initial_days=None,
+                 max_workers=None, disease=None, location=None):
+        """
+        Rolling-origin backtest of the model on historical data
+        
+        Args:
+            data (pd.DataFrame): Full historical data
+            horizon_days (int): Length of each evaluation window in days
+            period_days (int, optional): Days between cutoffs (default: horizon_days)
+            initial_days (int, optional): Minimum training history (default: 3 * horizon_days)
+            max_workers (int, optional): Processes used to fit folds in parallel
+            disease (str, optional): Disease the series belongs to (selects tuned params)
+            location (str, optional): Location the series belongs to (selects tuned params)
+            
+        Returns:
+            tuple: (per-fold metrics DataFrame, aggregated metrics DataFrame)
+        """
+        return backtest(
+            self.prepare_data(data),
+            self.params_for(disease, location),
+            horizon=f"{horizon_days} days",
+            period=f"{period_days} days" if period_days else None,
+            initial=f"{initial_days} days" if initial_days else None,
+            max_workers=max_workers
+        )
+    
+    def evaluate(self, data, forecast_days=30, max_workers=None, disease=None, location=None):
         """
         Evaluate model performance using historical data
         
         Args:
             data (pd.DataFrame): Full historical data
-            forecast_days (int): Number of days to use for evaluation
+            forecast_days (int): Number of days in each evaluation window
+            max_workers (int, optional): Processes used to fit folds in parallel
+            disease (str, optional): Disease the series belongs to (selects tuned params)
+            location (str, optional): Location the series belongs to (selects tuned params)
             
         Returns:
-            dict: Evaluation metrics
+            dict: Evaluation metrics averaged over all backtest folds
         """
-        # Split data into training and test sets
-        split_date = data['date'].max() - pd.Timedelta(days=forecast_days)
-        train_data = data[data['date'] <= split_date]
-        test_data = data[data['date'] > split_date]
+        folds, summary = self.backtest(data, horizon_days=forecast_days,
+                                       max_workers=max_workers,
+                                       disease=disease, location=location)
         
-        # Train model on training data
-        self.train(train_data)
+        metrics = summary['mean'].to_dict()
+        metrics['folds'] = len(folds)
         
-        # Generate forecast for test period
-        forecast = self.forecast(train_data, days=forecast_days)
+        return metrics
+    
+    def tune(self, data, disease=None, location=None, grid=None, n_iter=None,
+             metric='rmse', horizon_days=30, max_workers=None, force=False):
+        """
+        Search for the best Prophet parameters for a series
         
-        # Calculate metrics
-        actual = test_data.set_index('date')['cases']
-        predicted = forecast.set_index('date')['predicted_cases']
+        Candidates are scored by rolling-origin backtests in a process pool. The
+        winner is saved in the tuned params store, so later fits and forecasts of
+        the series use it; a series that was already tuned is not searched again
+        unless force is set.
         
-        # Only compare dates that exist in both actual and predicted
-        common_dates = actual.index.intersection(predicted.index)
-        actual = actual[common_dates]
-        predicted = predicted[common_dates]
+        Args:
+            data (pd.DataFrame): Full historical data
+            disease (str, optional): Disease the series belongs to
+            location (str, optional): Location the series belongs to
+            grid (dict, optional): Values to search per parameter (default: tuning.PARAM_GRID)
+            n_iter (int, optional): Random-search budget; the full grid if omitted
+            metric (str): Backtest metric to minimise ('mae', 'rmse' or 'mape')
+            horizon_days (int): Length of each backtest window in days
+            max_workers (int, optional): Processes evaluating candidates in parallel
+            force (bool): Search again even if tuned parameters are cached
+            
+        Returns:
+            tuple: (best parameter dict, DataFrame of evaluated candidates or None
+                if cached parameters were reused)
+        """
+        if self.tuned_params is None:
+            raise ValueError("DiseaseForecaster was created without a tuned params store")
         
-        metrics = {
-            'mae': mean_absolute_error(actual, predicted),
-            'rmse': np.sqrt(mean_squared_error(actual, predicted)),
-            'mape': np.mean(np.abs((actual - predicted) / actual)) * 100
-        }
+        if not force:
+            cached = self.tuned_params.get(disease, location)
+            if cached is not None:
+                return {**self.model_params, **cached}, None
         
-        return metrics
+        best, results = self.inflight.do(('tune', disease, location), self._search_and_store,
+                                         self.prepare_data(data), disease, location, grid,
+                                         n_iter, metric, horizon_days, max_workers)
+        
+        return best, results
+    
+    def _search_and_store(self, prophet_data, disease, location, grid, n_iter, metric,
+                          horizon_days, max_workers):
+        best, results = search(prophet_data, self.model_params, grid=grid, n_iter=n_iter,
+                               metric=metric, max_workers=max_workers,
+                               horizon=f"{horizon_days} days")
+        self.tuned_params.put(disease, location, best, metric, float(results[metric].iloc[0]))
+        return best, results
+
+
+def warm_start_params(model):
+    """
+    Extract fitted parameters from a Prophet model to initialise a new fit
+    
+    Args:
+        model (Prophet): Fitted model (MAP estimate)
+        
+    Returns:
+        dict: Initial values for Stan's optimizer
+    """
+    params = {name: model.params[name][0][0] for name in ['k', 'm', 'sigma_obs']}
+    params.update({name: model.params[name][0] for name in ['delta', 'beta']})
+    return params
+
+
+def _fit_prophet(model_params, prophet_data, init=None):
+    """Fit a Prophet model, warm-starting from `init` when given"""
+    model = Prophet(**model_params)
+    if init is not None:
+        try:
+            return model.fit(prophet_data, init=init)
+        except Exception as e:
+            # Shapes change when the number of changepoints or seasonal
+            # features differs from the previous fit; fall back to a cold fit
+            logger.info(f"Warm start failed, fitting from scratch: {e}")
+            model = Prophet(**model_params)
+    return model.fit(prophet_data)
+
+
+def analytic_intervals(model, prediction):
+    """
+    Closed-form prediction intervals for a fitted Prophet model
+    
+    Approximates Prophet's simulated uncertainty with a normal distribution:
+    observation noise (sigma_obs) plus future trend changes. Prophet draws
+    changepoints beyond the history at rate S per unit of scaled time, each
+    with a Laplace(0, lambda) rate change, so the trend offset at scaled time
+    t > 1 has variance 2 * S * lambda^2 * (t - 1)^3 / 3.
+    
+    Args:
+        model (Prophet): Fitted model
+        prediction (pd.DataFrame): Output of model.predict for the same model
+        
+    Returns:
+        tuple: (lower, upper) arrays aligned with the prediction rows
+    """
+    t = ((prediction['ds'] - model.start) / model.t_scale).to_numpy()
+    ahead = np.clip(t - 1, 0, None)
+    
+    n_changepoints = len(model.changepoints_t) if model.changepoints_t is not None else 0
+    lambda_ = np.mean(np.abs(model.params['delta'])) + 1e-8
+    trend_std = np.sqrt(2 * n_changepoints * lambda_ ** 2 * ahead ** 3 / 3) * model.y_scale
+    trend_std *= np.abs(1 + prediction['multiplicative_terms'].to_numpy())
+    noise_std = np.mean(model.params['sigma_obs']) * model.y_scale
+    
+    z = NormalDist().inv_cdf(0.5 + model.interval_width / 2)
+    width = z * np.sqrt(noise_std ** 2 + trend_std ** 2)
+    yhat = prediction['yhat'].to_numpy()
+    
+    return yhat - width, yhat + width
+
+
+def _fit_and_predict(model_params, prophet_data, days, init=None, interval_mode='full',
+                     interval_samples=None):
+    """Fit and predict a single series inside a batch worker process"""
+    model = _fit_prophet(model_params, prophet_data, init)
+    prediction = ProphetEngine.predict_model(model, days, interval_mode, interval_samples)
+    return prediction, model_to_json(model)
@@ -0,0 +1,273 @@
+"""
+Forecast Store Module
+Precomputed forecasts for known disease/location pairs, refreshed in the
+background so API requests can be served without fitting a model
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from io import StringIO
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # not on Windows; every worker then refreshes on schedule
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class ForecastStore:
+    """Latest forecast per (disease, location), held in memory and optionally on disk"""
+
+    def __init__(self, store_dir: str = None):
+        """
+        Initialize the forecast store
+
+        Args:
+            store_dir (str, optional): Directory where forecasts are persisted so
+                that every worker and restart can serve them
+        """
+        self.store_dir = store_dir
+        self._entries = {}
+        # Modification time of the file each entry was read from or written to
+        self._mtimes = {}
+        self._lock = threading.RLock()
+        self._scheduler_lock = None
+
+        if self.store_dir:
+            os.makedirs(self.store_dir, exist_ok=True)
+
+    def put(self, disease: str, location: str, forecast: pd.DataFrame,
+            data_as_of: datetime, horizon: int, engine: str) -> Dict:
+        """
+        Store a freshly computed forecast
+
+        Args:
+            disease (str): Disease name
+            location (str): Location identifier
+            forecast (pd.DataFrame): Output of DiseaseForecaster.forecast
+            data_as_of (datetime): Last date of the data the forecast was fitted on
+            horizon (int): Number of days forecast beyond data_as_of
+            engine (str): Engine that produced the forecast
+
+        Returns:
+            dict: The stored entry
+        """
+        entry = {
+            'forecast': forecast,
+            'generated_at': datetime.now(),
+            'data_as_of': pd.Timestamp(data_as_of).to_pydatetime(),
+            'horizon': horizon,
+            'engine': engine
+        }
+
+        self._save(disease, location, entry)
+        with self._lock:
+            self._entries[(disease, location)] = entry
+            self._mtimes[(disease, location)] = self._mtime(disease, location)
+
+        return entry
+
+    def get(self, disease: str, location: str) -> Optional[Dict]:
+        """
+        Return the stored entry for a key, or None if it was never computed
+
+        Entries are read again when their file was rewritten, so forecasts
+        refreshed by another worker are served by every worker.
+        """
+        key = (disease, location)
+        mtime = self._mtime(disease, location)
+        with self._lock:
+            entry = self._entries.get(key)
+            if mtime is None or (entry is not None and self._mtimes.get(key) == mtime):
+                return entry
+
+        loaded = self._load(disease, location)
+        if loaded is None:
+            return entry
+
+        with self._lock:
+            self._entries[key] = loaded
+            self._mtimes[key] = mtime
+        return loaded
+
+    def claim_scheduler(self) -> bool:
+        """
+        Whether this process should refresh forecasts on schedule
+
+        The first process to claim it keeps the claim until it exits, so only
+        one of several workers sharing the store directory refits the targets.
+        """
+        if not self.store_dir or fcntl is None:
+            return True
+        if self._scheduler_lock is not None:
+            return True
+
+        handle = open(os.path.join(self.store_dir, 'scheduler.lock'), 'a')
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return False
+        self._scheduler_lock = handle
+        return True
+
+    def keys(self) -> List[Tuple[str, str]]:
+        with self._lock:
+            return list(self._entries)
+
+    def _path(self, disease: str, location: str) -> str:
+        digest = hashlib.sha1(f"{disease}|{location}".encode('utf-8')).hexdigest()
+        return os.path.join(self.store_dir, f"{digest}.json")
+
+    def _mtime(self, disease: str, location: str) -> Optional[int]:
+        if not self.store_dir:
+            return None
+        try:
+            return os.stat(self._path(disease, location)).st_mtime_ns
+        except OSError:
+            return None
+
+    def _save(self, disease: str, location: str, entry: Dict) -> None:
+        if not self.store_dir:
+            return
+
+        path = self._path(disease, location)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump({
+                    'disease': disease,
+                    'location': location,
+                    'generated_at': entry['generated_at'].isoformat(),
+                    'data_as_of': entry['data_as_of'].isoformat(),
+                    'horizon': entry['horizon'],
+                    'engine': entry['engine'],
+                    'forecast': entry['forecast'].to_json(orient='split', date_format='iso',
+                                                          index=False)
+                }, f)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Could not persist forecast for {disease}/{location}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _load(self, disease: str, location: str) -> Optional[Dict]:
+        if not self.store_dir:
+            return None
+
+        path = self._path(disease, location)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, 'r') as f:
+                stored = json.load(f)
+            forecast = pd.read_json(StringIO(stored['forecast']), orient='split')
+            forecast['date'] = pd.to_datetime(forecast['date']).dt.tz_localize(None)
+            return {
+                'forecast': forecast,
+                'generated_at': datetime.fromisoformat(stored['generated_at']),
+                'data_as_of': datetime.fromisoformat(stored['data_as_of']),
+                'horizon': stored['horizon'],
+                'engine': stored['engine']
+            }
+        except Exception as e:
+            logger.warning(f"Could not load stored forecast {path}: {e}")
+            return None
+
+
+class ForecastScheduler:
+    """Background thread that recomputes forecasts for a known set of series"""
+
+    def __init__(self, forecaster, data_collector, store: ForecastStore,
+                 targets: List[Tuple[str, str]], interval: float = 6 * 3600,
+                 horizon: int = 90, engine: str = 'prophet'):
+        """
+        Initialize the scheduler
+
+        Args:
+            forecaster (DiseaseForecaster): Forecaster used to compute forecasts
+            data_collector (DataCollector): Source of historical data
+            store (ForecastStore): Store the forecasts are written to
+            targets (list): (disease, location) pairs to keep fresh
+            interval (float): Seconds between scheduled refreshes
+            horizon (int): Days forecast for each target; requests for up to
+                this many days are served from the store
+            engine (str): Forecasting engine used for precomputation
+        """
+        self.forecaster = forecaster
+        self.data_collector = data_collector
+        self.store = store
+        self.targets = list(targets)
+        self.interval = interval
+        self.horizon = horizon
+        self.engine = engine
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def refresh(self) -> Dict[Tuple[str, str], str]:
+        """
+        Recompute all targets now
+
+        Returns:
+            dict: 'success' or the error message for each target
+        """
+        status = {}
+        for disease, location in self.targets:
+            try:
+                data = self.data_collector.get_historical_data(disease, location)
+                forecast = self.forecaster.forecast(data, days=self.horizon, disease=disease,
+                                                    location=location, engine=self.engine)
+                self.store.put(disease, location, forecast,
+                               data_as_of=pd.to_datetime(data['date']).max(),
+                               horizon=self.horizon, engine=self.engine)
+                status[(disease, location)] = 'success'
+            except Exception as e:
+                logger.warning(f"Scheduled forecast failed for {disease}/{location}: {e}")
+                status[(disease, location)] = str(e)
+
+        logger.info(f"Refreshed {sum(s == 'success' for s in status.values())}"
+                    f"/{len(status)} stored forecasts")
+        return status
+
+    def trigger(self) -> None:
+        """
+        Request an immediate refresh, e.g. right after a data sync
+
+        The refresh runs in this worker even if another one holds the
+        schedule; the results reach every worker through the store directory.
+        """
+        self._wakeup.set()
+
+    def start(self) -> None:
+        """Start refreshing in a background daemon thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name='forecast-scheduler', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._wakeup.set()
+
+    def _run(self) -> None:
+        # Every worker starts a scheduler; the one holding the store's claim
+        # refreshes every interval, the others only when triggered, and take
+        # over the schedule if the claimant exits
+        triggered = False
+        while not self._stopped.is_set():
+            if triggered or self.store.claim_scheduler():
+                self.refresh()
+            triggered = self._wakeup.wait(self.interval)
+            self._wakeup.clear()
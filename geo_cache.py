@@ -0,0 +1,138 @@
+"""
+Geo Cache Module
+Persistent destination -> coordinates cache for geocoding lookups, and the
+keys used to cache location-based upstream responses
+"""
+
+import json
+import math
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Decimal places coordinates are rounded to for weather lookups (~11 km),
+# well within the resolution of the upstream forecast grid
+WEATHER_PRECISION = 1
+# OpenWeather updates its 5-day/3-hour forecast every 3 hours
+WEATHER_TTL = 3 * 3600
+
+# Nearby searches are shared by every user in a grid cell this fraction of the
+# search radius wide, so a search is never made from more than a fifth of the
+# radius away from the user
+HOSPITAL_CELL_FRACTION = 0.25
+HOSPITAL_TTL = 24 * 3600
+# Phone numbers and websites of a place rarely change
+PLACE_DETAILS_TTL = 7 * 24 * 3600
+METERS_PER_DEGREE = 111320
+
+
+def normalize_destination(destination: str) -> str:
+    """Key a destination by its case- and whitespace-insensitive name"""
+    return ', '.join(' '.join(part.split()) for part in destination.lower().split(','))
+
+
+def weather_key(lat: float, lon: float) -> Tuple[float, float]:
+    """Weather cache key shared by nearby coordinates"""
+    return (round(lat, WEATHER_PRECISION), round(lon, WEATHER_PRECISION))
+
+
+def grid_cell(lat: float, lon: float, radius: int) -> Tuple[int, int, int]:
+    """
+    Spatial cache key of a nearby search
+
+    Args:
+        lat: Latitude of the search
+        lon: Longitude of the search
+        radius: Search radius in meters; larger searches use larger cells
+
+    Returns:
+        Tuple of the radius and the cell's row and column
+    """
+    size = radius * HOSPITAL_CELL_FRACTION / METERS_PER_DEGREE
+    return (radius, math.floor(lat / size), math.floor(lon / size))
+
+
+def cell_center(cell: Tuple[int, int, int]) -> Tuple[float, float]:
+    """Coordinates a cell's nearby search is made from"""
+    radius, row, col = cell
+    size = radius * HOSPITAL_CELL_FRACTION / METERS_PER_DEGREE
+    return (round((row + 0.5) * size, 6), round((col + 0.5) * size, 6))
+
+
+def district_destinations(state_districts: Dict[str, List[str]]) -> List[str]:
+    """'District, State' destinations for every supported district"""
+    return [f"{district}, {state}"
+            for state, districts in state_districts.items()
+            for district in districts]
+
+
+class GeocodeCache:
+    """Destination coordinates, kept indefinitely and optionally persisted to a JSON file"""
+
+    def __init__(self, path: str = None):
+        """
+        Initialize the cache
+
+        Args:
+            path (str, optional): JSON file the coordinates are loaded from and
+                saved to; memory only if omitted
+        """
+        self.path = path
+        self._coords = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+        if self.path and os.path.exists(self.path):
+            try:
+                with open(self.path, 'r') as f:
+                    self._coords = {key: tuple(value) for key, value in json.load(f).items()}
+            except Exception as e:
+                print(f"Could not load geocode cache {self.path}: {e}")
+
+    def get(self, destination: str) -> Optional[Tuple[float, float]]:
+        """(lat, lon) of a destination, or None if it was never geocoded"""
+        with self._lock:
+            coords = self._coords.get(normalize_destination(destination))
+            if coords is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+            return coords
+
+    def set(self, destination: str, lat: float, lon: float) -> None:
+        self.update({destination: (lat, lon)})
+
+    def update(self, coords: Dict[str, Tuple[float, float]]) -> None:
+        """Record coordinates for several destinations and save them once"""
+        if not coords:
+            return
+        with self._lock:
+            for destination, (lat, lon) in coords.items():
+                self._coords[normalize_destination(destination)] = (float(lat), float(lon))
+            self._save()
+
+    def missing(self, destinations: Iterable[str]) -> List[str]:
+        """Destinations not in the cache yet"""
+        with self._lock:
+            return [destination for destination in destinations
+                    if normalize_destination(destination) not in self._coords]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'entries': len(self._coords), 'hits': self._hits, 'misses': self._misses}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._coords)
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump({key: list(value) for key, value in self._coords.items()}, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Could not save geocode cache {self.path}: {e}")
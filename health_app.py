@@ -3,7 +3,9 @@ import os
 from dotenv import load_dotenv
 from database import SupabaseClient
 from api_services import APIServices
+from surveillance_store import SurveillanceIngestor
 import json
+import threading
 from datetime import datetime, timedelta
 
 # Load environment variables
@@ -16,6 +18,26 @@ app.secret_key = os.getenv('SECRET_KEY', 'your-secret-key-change-in-production')
 db = SupabaseClient()
 api_services = APIServices()
 
+# Incremental IDSP ingestion into the local surveillance store (IDSP_STORE_DIR)
+if api_services.idsp_service.store is not None and os.getenv('IDSP_INGEST', '1') == '1':
+    surveillance_ingestor = SurveillanceIngestor(
+        api_services.idsp_service,
+        api_services.idsp_service.store,
+        states=[state for state in os.getenv(
+            'IDSP_INGEST_STATES', 'Uttar Pradesh,Bihar,West Bengal,Delhi,Maharashtra'
+        ).split(',') if state],
+        weeks_back=int(os.getenv('IDSP_INGEST_WEEKS', 8)),
+        interval=float(os.getenv('IDSP_INGEST_SECONDS', 6 * 3600))
+    )
+    surveillance_ingestor.start()
+
+# Geocode every supported district once into the persistent geocode cache, so
+# travel requests skip the lookup; opt-in, and only with a cache that survives
+# restarts, since every seeding run costs one OpenWeather call per district
+if os.getenv('GEOCODE_SEED', '0') == '1' and api_services.geocode_cache.path:
+    threading.Thread(target=api_services.seed_geocode_cache, name='geocode-seed',
+                     daemon=True).start()
+
 # Routes
 @app.route('/')
 def home():
@@ -195,6 +217,11 @@ def get_nearby_hospitals():
             'hospitals': api_services.get_mock_hospital_data()
         }), 500
 
+@app.route('/api/http/stats')
+def get_http_stats():
+    """Circuit breaker states and connection reuse of the outbound HTTP pools"""
+    return jsonify(api_services.http.stats())
+
 @app.route('/api/risk-assessment')
 def get_risk_assessment():
     user_id = session.get('user_id', 1)
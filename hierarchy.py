@@ -0,0 +1,140 @@
+"""
+Hierarchy Module
+District -> state -> national aggregation structure and forecast
+reconciliation (bottom-up, OLS and MinT-style WLS) as matrix operations
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+LEVELS = ('national', 'state', 'district')
+RECONCILIATION_METHODS = ('bottom_up', 'ols', 'mint')
+
+
+class Hierarchy:
+    """Three-level surveillance hierarchy with its summing matrix"""
+
+    def __init__(self, state_districts: Dict[str, List[str]], national: Optional[str] = 'India'):
+        """
+        Build the hierarchy
+
+        Args:
+            state_districts (dict): District names per state
+            national (str, optional): Name of the national node; None for a
+                hierarchy rooted at its (single) state
+        """
+        self.state_districts = {state: list(districts)
+                                for state, districts in state_districts.items()}
+        self.national = national
+
+        top = [('national', national)] if national is not None else []
+        self.bottom = [('district', district)
+                       for districts in self.state_districts.values() for district in districts]
+        self.nodes = (top
+                      + [('state', state) for state in self.state_districts]
+                      + self.bottom)
+        self._index = {node: i for i, node in enumerate(self.nodes)}
+
+        # Summing matrix: every node is a sum of bottom-level series
+        self.S = np.zeros((len(self.nodes), len(self.bottom)))
+        if top:
+            self.S[0, :] = 1
+        column = 0
+        for row, districts in enumerate(self.state_districts.values(), start=len(top)):
+            self.S[row, column:column + len(districts)] = 1
+            column += len(districts)
+        self.S[len(self.nodes) - len(self.bottom):, :] = np.eye(len(self.bottom))
+
+    def index(self, level: str, name: str) -> int:
+        """Row of a node in S"""
+        if (level, name) not in self._index:
+            raise ValueError(f"Unknown {level} '{name}' in hierarchy")
+        return self._index[(level, name)]
+
+    def state_of(self, district: str) -> Optional[str]:
+        for state, districts in self.state_districts.items():
+            if district in districts:
+                return state
+        return None
+
+    def subtree(self, level: str, name: str) -> 'Hierarchy':
+        """
+        Smallest hierarchy containing a node and everything it must be coherent with
+
+        Args:
+            level (str): 'national', 'state' or 'district'
+            name (str): Node name
+
+        Returns:
+            Hierarchy: The full hierarchy for the national level, otherwise the
+                hierarchy rooted at the node's state; a national node equal to
+                the one state would duplicate its row of S
+        """
+        if level == 'national':
+            return self
+
+        state = self.state_of(name) if level == 'district' else name
+        if state not in self.state_districts:
+            raise ValueError(f"Unknown {level} '{name}' in hierarchy")
+
+        return Hierarchy({state: self.state_districts[state]}, national=None)
+
+
+def reconciliation_matrix(S: np.ndarray, method: str = 'mint',
+                          variances: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Build the matrix G mapping base forecasts of every node to bottom-level forecasts
+
+    Args:
+        S (np.ndarray): Summing matrix, shape (n_nodes, n_bottom)
+        method (str): 'bottom_up', 'ols' or 'mint' (WLS with in-sample variances)
+        variances (np.ndarray, optional): Base forecast error variance per node,
+            required for 'mint'
+
+    Returns:
+        np.ndarray: G with shape (n_bottom, n_nodes); reconciled forecasts are S @ G @ base
+    """
+    n_nodes, n_bottom = S.shape
+
+    if method == 'bottom_up':
+        G = np.zeros((n_bottom, n_nodes))
+        G[:, n_nodes - n_bottom:] = np.eye(n_bottom)
+        return G
+
+    if method == 'ols':
+        weights = np.ones(n_nodes)
+    elif method == 'mint':
+        if variances is None:
+            raise ValueError("MinT reconciliation needs base forecast variances")
+        weights = np.asarray(variances, dtype=float)
+        valid = np.isfinite(weights) & (weights > 0)
+        fill = weights[valid].mean() if valid.any() else 1.0
+        weights = np.where(valid, weights, fill)
+    else:
+        raise ValueError(f"Unknown reconciliation method '{method}', "
+                         f"expected one of: {', '.join(RECONCILIATION_METHODS)}")
+
+    # G = (S' W^-1 S)^-1 S' W^-1 with W diagonal
+    St_Winv = S.T / weights
+    return np.linalg.solve(St_Winv @ S, St_Winv)
+
+
+def reconcile(base: np.ndarray, S: np.ndarray, method: str = 'mint',
+              variances: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reconcile base forecasts for all nodes and horizons at once
+
+    Args:
+        base (np.ndarray): Base forecasts, shape (n_nodes, n_steps); rows that are
+            not used by the method (upper levels for bottom_up) may be NaN
+        S (np.ndarray): Summing matrix, shape (n_nodes, n_bottom)
+        method (str): 'bottom_up', 'ols' or 'mint'
+        variances (np.ndarray, optional): Base forecast error variance per node
+
+    Returns:
+        tuple: (reconciled forecasts for every node, reconciled bottom-level forecasts)
+    """
+    G = reconciliation_matrix(S, method, variances)
+    bottom = G @ np.nan_to_num(base)
+    return S @ bottom, bottom
@@ -0,0 +1,124 @@
+"""
+Historical Series Module
+Compact representation of a regular case-count series: a start date and
+frequency instead of a stored date column, int32 counts, and the derived
+deaths/recovered columns computed only when asked for
+"""
+
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+# Rates used to derive the outcome columns from case counts
+DEATH_RATE = 0.01
+RECOVERY_RATE = 0.8
+
+COLUMNS = ('date', 'cases', 'deaths', 'recovered')
+
+
+class HistoricalSeries:
+    """Case counts at a fixed frequency, read like the DataFrame it replaces"""
+
+    __slots__ = ('start', 'freq', 'cases', '_step', '_dates')
+
+    def __init__(self, start, cases, freq: str = 'D'):
+        """
+        Initialize the series
+
+        Args:
+            start: Date of the first count
+            cases: Counts, one per period; int32 arrays are used without copying
+            freq (str): Fixed frequency of the counts
+        """
+        self.start = pd.Timestamp(start).normalize()
+        self.freq = freq
+        self.cases = np.asarray(cases, dtype=np.int32)
+        self._step = pd.Timedelta(pd.tseries.frequencies.to_offset(freq).nanos)
+        self._dates = None
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, freq: str = 'D') -> 'HistoricalSeries':
+        """Build a series from a regular DataFrame with 'date' and 'cases' columns"""
+        if frame.empty:
+            raise ValueError("Cannot build a series from an empty frame")
+        return cls(frame['date'].iloc[0], frame['cases'].to_numpy(), freq=freq)
+
+    @staticmethod
+    def concat(parts: List['HistoricalSeries']) -> 'HistoricalSeries':
+        """
+        Combine series of the same frequency into one spanning all of them
+
+        Later parts win where they overlap; periods covered by no part are zero.
+        """
+        parts = [part for part in parts if len(part)]
+        if not parts:
+            raise ValueError("Cannot concatenate empty series")
+
+        start = min(part.start for part in parts)
+        end = max(part.end for part in parts)
+        step = parts[0]._step
+        cases = np.zeros((end - start) // step + 1, dtype=np.int32)
+        for part in parts:
+            offset = (part.start - start) // step
+            cases[offset:offset + len(part)] = part.cases
+
+        return HistoricalSeries(start, cases, freq=parts[0].freq)
+
+    @property
+    def end(self) -> pd.Timestamp:
+        return self.start + self._step * (len(self.cases) - 1)
+
+    @property
+    def dates(self) -> pd.DatetimeIndex:
+        if self._dates is None:
+            self._dates = pd.date_range(self.start, periods=len(self.cases), freq=self.freq)
+        return self._dates
+
+    @property
+    def deaths(self) -> np.ndarray:
+        return (self.cases * DEATH_RATE).astype(np.int32)
+
+    @property
+    def recovered(self) -> np.ndarray:
+        return (self.cases * RECOVERY_RATE).astype(np.int32)
+
+    @property
+    def columns(self) -> List[str]:
+        return list(COLUMNS)
+
+    @property
+    def empty(self) -> bool:
+        return len(self.cases) == 0
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.cases.nbytes)
+
+    def __len__(self) -> int:
+        return len(self.cases)
+
+    def __getitem__(self, column: str) -> pd.Series:
+        if column == 'date':
+            return pd.Series(self.dates, name='date')
+        if column in COLUMNS:
+            return pd.Series(getattr(self, column), name=column, copy=False)
+        raise KeyError(column)
+
+    def slice(self, start, end) -> 'HistoricalSeries':
+        """Periods between start and end (inclusive), sharing this series' counts"""
+        lo = min(max((pd.Timestamp(start) - self.start) // self._step, 0), len(self.cases))
+        hi = min(max((pd.Timestamp(end) - self.start) // self._step + 1, lo), len(self.cases))
+        return HistoricalSeries(self.start + self._step * lo, self.cases[lo:hi], freq=self.freq)
+
+    def to_frame(self, derived: bool = True) -> pd.DataFrame:
+        """Materialize as a DataFrame with 'date', 'cases' and optionally the derived columns"""
+        data = {'date': self.dates, 'cases': self.cases}
+        if derived:
+            data['deaths'] = self.deaths
+            data['recovered'] = self.recovered
+        return pd.DataFrame(data, copy=False)
+
+    def to_prophet(self) -> pd.DataFrame:
+        """'ds'/'y' frame for the forecaster, backed by the stored counts"""
+        return pd.DataFrame({'ds': self.dates, 'y': self.cases}, copy=False)
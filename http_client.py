@@ -0,0 +1,371 @@
+"""
+HTTP Client Module
+Shared outbound HTTP layer: keep-alive connection pools sized per upstream
+host, per-upstream connect/read timeouts, jittered retries limited by a
+retry budget, and a circuit breaker per upstream so callers fall back
+immediately while an upstream is down
+"""
+
+import random
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Status codes worth retrying; other responses are returned to the caller
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised instead of calling an upstream whose circuit breaker is open"""
+
+
+class UpstreamPolicy:
+    """Timeouts, retries and breaker settings for one upstream"""
+
+    def __init__(self, connect_timeout: float = 3.05, read_timeout: float = 10,
+                 retries: int = 2, backoff: float = 0.25, backoff_max: float = 4,
+                 retry_ratio: float = 0.2, failure_threshold: int = 5,
+                 reset_timeout: float = 30):
+        """
+        Initialize the policy
+
+        Args:
+            connect_timeout: Seconds allowed to establish a connection
+            read_timeout: Seconds allowed between bytes of the response
+            retries: Maximum retries of one call
+            backoff: Base delay of the exponential backoff between retries
+            backoff_max: Cap on the delay between retries
+            retry_ratio: Retries allowed per call made, averaged over time, so
+                a failing upstream does not receive (retries + 1) times the load
+            failure_threshold: Consecutive failures that open the breaker
+            reset_timeout: Seconds the breaker stays open before a trial call
+        """
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.retry_ratio = retry_ratio
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+    @property
+    def timeout(self):
+        return (self.connect_timeout, self.read_timeout)
+
+    def delay(self, attempt: int) -> float:
+        """Jittered delay before retry number attempt (from 1)"""
+        return random.uniform(0, min(self.backoff_max, self.backoff * 2 ** (attempt - 1)))
+
+
+# Defaults for the upstreams the application calls
+UPSTREAMS = {
+    'idsp': UpstreamPolicy(read_timeout=10),
+    'openweather': UpstreamPolicy(read_timeout=5),
+    'google_places': UpstreamPolicy(read_timeout=5),
+    # Generation is slow and costly to repeat, so allow long reads but no retries
+    'gemini': UpstreamPolicy(read_timeout=30, retries=0, failure_threshold=3, reset_timeout=60),
+}
+
+# Keep-alive connections kept per upstream host: about the number of calls
+# made to it concurrently by all request threads
+HOST_POOL_SIZES = {
+    'idsp.nic.in': 8,
+    'api.openweathermap.org': 8,
+    # Place details are looked up for several hospitals per search
+    'maps.googleapis.com': 16,
+    'generativelanguage.googleapis.com': 4,
+}
+DEFAULT_POOL_SIZE = 10
+
+
+class PooledAdapter(HTTPAdapter):
+    """HTTPAdapter counting requests against the connections its pools open"""
+
+    def __init__(self, pool_maxsize: int = DEFAULT_POOL_SIZE, **kwargs):
+        # Not blocking: bursts past pool_maxsize open extra connections rather
+        # than waiting (without a timeout) for a pooled one
+        super().__init__(pool_connections=4, pool_maxsize=pool_maxsize, **kwargs)
+        self._pools = {}
+        self._lock = threading.Lock()
+
+    def get_connection_with_tls_context(self, request, verify, proxies=None, cert=None):
+        pool = super().get_connection_with_tls_context(request, verify, proxies=proxies, cert=cert)
+        self._track(pool)
+        return pool
+
+    def get_connection(self, url, proxies=None):
+        pool = super().get_connection(url, proxies=proxies)
+        self._track(pool)
+        return pool
+
+    def _track(self, pool) -> None:
+        # Pools evicted from the pool manager take their counters with them,
+        # so keep a reference to every pool seen
+        with self._lock:
+            self._pools[id(pool)] = pool
+
+    def stats(self) -> Dict[str, Dict]:
+        """Requests made and connections opened per host"""
+        with self._lock:
+            pools = list(self._pools.values())
+
+        hosts = {}
+        for pool in pools:
+            host = hosts.setdefault(pool.host, {'requests': 0, 'connections': 0})
+            host['requests'] += pool.num_requests
+            host['connections'] += pool.num_connections
+
+        for host in hosts.values():
+            requests_made = host['requests']
+            host['reuse_rate'] = (round(1 - host['connections'] / requests_made, 4)
+                                  if requests_made else None)
+        return hosts
+
+
+def pooled_session(pool_sizes: Dict[str, int] = None,
+                   default_size: int = DEFAULT_POOL_SIZE) -> requests.Session:
+    """
+    Session with a keep-alive connection pool per upstream host
+
+    Args:
+        pool_sizes: Connections kept per host; HOST_POOL_SIZES if omitted
+        default_size: Connections kept for hosts not listed
+
+    Returns:
+        requests.Session: Session whose adapters are PooledAdapters
+    """
+    session = requests.Session()
+    default = PooledAdapter(pool_maxsize=default_size)
+    session.mount('https://', default)
+    session.mount('http://', default)
+
+    for host, size in (HOST_POOL_SIZES if pool_sizes is None else pool_sizes).items():
+        adapter = PooledAdapter(pool_maxsize=size)
+        session.mount(f'https://{host}/', adapter)
+        session.mount(f'http://{host}/', adapter)
+    return session
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single trial call when half open"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial = False
+        self._lock = threading.Lock()
+        self._rejected = 0
+        self._opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may go out now; a half-open breaker lets one trial call through"""
+        with self._lock:
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    self._rejected += 1
+                    return False
+                self._state = self.HALF_OPEN
+                self._trial = False
+
+            if self._state == self.HALF_OPEN:
+                if self._trial:
+                    self._rejected += 1
+                    return False
+                self._trial = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self._opened += 1
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._trial = False
+
+    def stats(self) -> Dict:
+        state = self.state
+        with self._lock:
+            return {
+                'state': state,
+                'consecutive_failures': self._failures,
+                'opened': self._opened,
+                'rejected': self._rejected
+            }
+
+
+class RetryBudget:
+    """Token bucket refilled by calls and drained by retries"""
+
+    def __init__(self, ratio: float, max_tokens: float = 10):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+class HTTPClient:
+    """requests wrapper applying an upstream's policy to every call made for it"""
+
+    def __init__(self, policies: Dict[str, UpstreamPolicy] = None,
+                 session: requests.Session = None, pool_sizes: Dict[str, int] = None):
+        """
+        Initialize the client
+
+        Args:
+            policies: Policy per upstream name; UPSTREAMS if omitted. Unknown
+                upstreams get the default UpstreamPolicy
+            session: Session used for calls that do not pass their own; a
+                pooled_session if omitted
+            pool_sizes: Connections kept per host by the pooled session
+        """
+        self.policies = dict(UPSTREAMS if policies is None else policies)
+        self.session = session or pooled_session(pool_sizes)
+        self._breakers = {}
+        self._budgets = {}
+        self._lock = threading.Lock()
+
+    def policy(self, upstream: str) -> UpstreamPolicy:
+        with self._lock:
+            return self.policies.setdefault(upstream, UpstreamPolicy())
+
+    def breaker(self, upstream: str) -> CircuitBreaker:
+        policy = self.policy(upstream)
+        with self._lock:
+            if upstream not in self._breakers:
+                self._breakers[upstream] = CircuitBreaker(policy.failure_threshold,
+                                                          policy.reset_timeout)
+            return self._breakers[upstream]
+
+    def available(self, upstream: str) -> bool:
+        """Whether calls to an upstream are currently let through"""
+        return self.breaker(upstream).state != CircuitBreaker.OPEN
+
+    def request(self, upstream: str, method: str, url: str,
+                session: Optional[requests.Session] = None, **kwargs) -> requests.Response:
+        """
+        Make a call to an upstream under its policy
+
+        Args:
+            upstream: Name of the upstream, selecting the policy and breaker
+            method: HTTP method
+            url: URL to call
+            session: Session to use instead of the client's own
+            **kwargs: Passed to requests; the policy timeout applies unless
+                'timeout' is given
+
+        Returns:
+            requests.Response: Last response received; retryable statuses are
+                returned once retries are exhausted
+
+        Raises:
+            CircuitOpenError: If the upstream's breaker is open
+            requests.RequestException: If the last attempt failed to connect or
+                timed out
+        """
+        policy = self.policy(upstream)
+        breaker = self.breaker(upstream)
+        budget = self.budget(upstream)
+        session = session or self.session
+        kwargs.setdefault('timeout', policy.timeout)
+
+        if not breaker.allow():
+            raise CircuitOpenError(f"Circuit for {upstream} is open")
+        budget.deposit()
+
+        attempt = 0
+        try:
+            while True:
+                try:
+                    response = session.request(method, url, **kwargs)
+                    error = None
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    response, error = None, e
+
+                failed = error is not None or response.status_code in RETRY_STATUSES
+                if not failed:
+                    breaker.record_success()
+                    return response
+
+                if attempt >= policy.retries or not budget.withdraw():
+                    break
+
+                attempt += 1
+                time.sleep(policy.delay(attempt))
+        except BaseException:
+            # Any other error (bad encoding, redirects, invalid URL, interruption)
+            # still ends the call, so a half-open breaker's trial is not leaked
+            breaker.record_failure()
+            raise
+
+        breaker.record_failure()
+        if error is not None:
+            raise error
+        return response
+
+    def get(self, upstream: str, url: str, **kwargs) -> requests.Response:
+        return self.request(upstream, 'GET', url, **kwargs)
+
+    def post(self, upstream: str, url: str, **kwargs) -> requests.Response:
+        return self.request(upstream, 'POST', url, **kwargs)
+
+    def stats(self) -> Dict[str, Dict]:
+        """Breaker state of every upstream called so far and connection reuse per host"""
+        with self._lock:
+            breakers = dict(self._breakers)
+
+        pools = {}
+        for adapter in {id(a): a for a in self.session.adapters.values()}.values():
+            if isinstance(adapter, PooledAdapter):
+                pools.update(adapter.stats())
+
+        return {
+            'breakers': {upstream: breaker.stats() for upstream, breaker in breakers.items()},
+            'pools': pools
+        }
+
+    def close(self) -> None:
+        self.session.close()
+
+    def budget(self, upstream: str) -> RetryBudget:
+        policy = self.policy(upstream)
+        with self._lock:
+            if upstream not in self._budgets:
+                self._budgets[upstream] = RetryBudget(policy.retry_ratio)
+            return self._budgets[upstream]
@@ -0,0 +1,252 @@
+"""
+IDSP Async Client Module
+Concurrent fan-out of IDSP weekly surveillance requests over one pooled,
+long-lived async HTTP session with bounded concurrency, plus a helper to
+drive it from synchronous Flask code
+"""
+
+import asyncio
+import os
+import threading
+from typing import Dict, List
+
+from http_client import RETRY_STATUSES, CircuitOpenError
+
+try:
+    import aiohttp
+except ImportError:  # optional; requests are run on worker threads without it
+    aiohttp = None
+
+# Requests in flight to IDSP at once per client
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_TIMEOUT = 10
+
+
+class _LoopThread:
+    """Event loop running for the life of the process, so sessions bound to it are reused"""
+
+    def __init__(self):
+        self._loop = None
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            # A forked worker inherits the object but not the thread
+            if self._loop is None or self._pid != os.getpid():
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever,
+                                                name='idsp-async', daemon=True)
+                self._thread.start()
+                self._pid = os.getpid()
+            return self._loop
+
+    def in_loop_thread(self) -> bool:
+        return self._thread is threading.current_thread()
+
+
+_runner = _LoopThread()
+
+
+def run_sync(coroutine):
+    """
+    Run a coroutine to completion from synchronous code
+
+    Coroutines run on a shared background event loop, so the aiohttp session
+    and its connection pool outlive individual calls.
+    """
+    if _runner.in_loop_thread():
+        # Called from a coroutine on the shared loop; blocking it would deadlock
+        result = {}
+
+        def target():
+            try:
+                result['value'] = asyncio.run(coroutine)
+            except BaseException as e:
+                result['error'] = e
+
+        thread = threading.Thread(target=target, name='idsp-async-nested')
+        thread.start()
+        thread.join()
+        if 'error' in result:
+            raise result['error']
+        return result['value']
+
+    return asyncio.run_coroutine_threadsafe(coroutine, _runner.loop()).result()
+
+
+class AsyncIDSPClient:
+    """Async counterpart of IDSPDataService's multi-request methods"""
+
+    def __init__(self, service, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 timeout: float = DEFAULT_TIMEOUT):
+        """
+        Initialize the client; one client is kept per service and reused
+
+        Args:
+            service (IDSPDataService): Service providing configuration, the local
+                store, parsing, fallbacks, the HTTP policy and the summary logic
+            max_concurrency: Maximum requests in flight (also the pool size)
+            timeout: Total seconds allowed per request
+        """
+        self.service = service
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._semaphore = None
+        self._session = None
+        self._loop = None
+
+    async def open(self) -> None:
+        """Create the session and semaphore on first use on the running loop"""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+
+        # Objects bound to another loop (e.g. one inherited across a fork) are dropped
+        self._loop = loop
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._session = None
+        if aiohttp is not None:
+            headers = {}
+            if self.service.api_key:
+                headers = {
+                    'Authorization': f'Bearer {self.service.api_key}',
+                    'Content-Type': 'application/json'
+                }
+            policy = self.service.http.policy('idsp')
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_concurrency),
+                timeout=aiohttp.ClientTimeout(total=self.timeout,
+                                              sock_connect=policy.connect_timeout,
+                                              sock_read=policy.read_timeout),
+                headers=headers
+            )
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+        self._session = None
+        self._loop = None
+
+    async def fetch_weekly_surveillance(self, state: str = None, district: str = None,
+                                        week: int = None, year: int = None) -> Dict:
+        """Fetch and parse one week, raising if IDSP is unavailable"""
+        await self.open()
+        async with self._semaphore:
+            if self._session is None:
+                return await asyncio.to_thread(self.service.fetch_weekly_surveillance,
+                                               state, district, week, year)
+
+            endpoint, params = self.service.weekly_request(state, district, week, year)
+            params = {key: str(value) for key, value in params.items()}
+            status, payload = await self._get('idsp', endpoint, params)
+
+        if status != 200:
+            raise RuntimeError(f"IDSP returned status {status}")
+        return self.service.parse_surveillance_response(payload)
+
+    async def _get(self, upstream: str, url: str, params: Dict):
+        """
+        GET under the upstream's HTTPClient policy: shared breaker and retry
+        budget, jittered retries of connection errors, timeouts and retryable
+        statuses; other statuses are returned without counting as failures
+        """
+        http = self.service.http
+        policy = http.policy(upstream)
+        breaker = http.breaker(upstream)
+        budget = http.budget(upstream)
+
+        if not breaker.allow():
+            raise CircuitOpenError(f"Circuit for {upstream} is open")
+        budget.deposit()
+
+        attempt = 0
+        try:
+            while True:
+                try:
+                    async with self._session.get(url, params=params) as response:
+                        status = response.status
+                        payload = (await response.json(content_type=None)
+                                   if status == 200 else None)
+                    error = None
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                    status, payload, error = None, None, e
+
+                if error is None and status not in RETRY_STATUSES:
+                    breaker.record_success()
+                    return status, payload
+
+                if attempt >= policy.retries or not budget.withdraw():
+                    break
+
+                attempt += 1
+                await asyncio.sleep(policy.delay(attempt))
+        except BaseException:
+            # Including cancellation, so a half-open breaker's trial is not leaked
+            breaker.record_failure()
+            raise
+
+        breaker.record_failure()
+        if error is not None:
+            raise error
+        return status, payload
+
+    async def get_weekly_surveillance_data(self, state: str = None, district: str = None,
+                                           week: int = None, year: int = None) -> Dict:
+        """Async version of IDSPDataService.get_weekly_surveillance_data"""
+        week, year = self.service.resolve_week(week, year)
+
+        stored = self.service.read_through(state, district, week, year)
+        if stored is not None:
+            return stored
+
+        try:
+            week_data = await self.fetch_weekly_surveillance(state, district, week, year)
+        except Exception as e:
+            print(f"IDSP API error: {e}")
+            return self.service.get_fallback_data(state or 'India')
+
+        self.service.write_through(state, district, week, year, week_data)
+        return week_data
+
+    async def get_weeks(self, state: str, periods: List[tuple]) -> List[Dict]:
+        """Weekly data of a state for (week, year) periods, fetched concurrently"""
+        return await asyncio.gather(*(
+            self.get_weekly_surveillance_data(state, week=week, year=year)
+            for week, year in periods
+        ))
+
+    async def get_outbreak_summary(self, state: str = None, weeks_back: int = 4) -> Dict:
+        """Async version of IDSPDataService.get_outbreak_summary; weeks are fetched concurrently"""
+        periods = self.service.summary_weeks(weeks_back)
+        results = await self.get_weeks(state, periods)
+
+        weeks = [(week, year, week_data) for (week, year), week_data in zip(periods, results)]
+        return self.service.summarize_outbreaks(state, weeks_back, weeks)
+
+    async def get_state_wise_summary(self, states: List[str], disease: str = None) -> Dict:
+        """Async version of IDSPDataService.get_state_wise_summary; states are fetched concurrently"""
+        ingested, stored_summary = self.service.stored_state_summaries(states)
+        remote = [state for state in states if state not in ingested]
+
+        results = await asyncio.gather(
+            *(self.get_weekly_surveillance_data(state=state) for state in remote),
+            return_exceptions=True
+        )
+        fetched = dict(zip(remote, results))
+
+        state_summary = {}
+        for state in states:
+            if state in ingested:
+                summary = stored_summary.get(state)
+            else:
+                state_data = fetched[state]
+                if isinstance(state_data, Exception):
+                    print(f"Error fetching data for {state}: {state_data}")
+                    continue
+                summary = self.service.summarize_state(state_data)
+            if summary is not None:
+                state_summary[state] = summary
+
+        return state_summary
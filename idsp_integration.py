@@ -6,23 +6,93 @@ Handles real-time disease surveillance data from Government of India's IDSP syst
 import requests
 import json
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import pandas as pd
+from http_client import HTTPClient
+from outbreak_detector import OutbreakDetector
+from surveillance_store import (SurveillanceCache, SurveillanceStore, current_epi_week,
+                                normalize_rows, previous_epi_weeks, week_is_final)
+from idsp_async import AsyncIDSPClient, run_sync
+from request_context import memoized
+from singleflight import SingleFlight
+
+# Seconds a stored copy of a week that is not final yet is served before refetching
+OPEN_WEEK_MAX_AGE = 3600
+
+# Weeks fed into the outbreak detector before a state's first scored week;
+# more than the detector's warm-up so the baseline is established
+DETECTOR_HISTORY_WEEKS = 8
+
+# Districts covered by the surveillance hierarchy (district -> state -> India)
+STATE_DISTRICTS = {
+    'Uttar Pradesh': [
+        'Agra', 'Aligarh', 'Ambedkar Nagar', 'Amethi', 'Amroha', 'Auraiya', 'Ayodhya', 'Azamgarh',
+        'Baghpat', 'Bahraich', 'Ballia', 'Balrampur', 'Banda', 'Barabanki', 'Bareilly', 'Basti',
+        'Bhadohi', 'Bijnor', 'Budaun', 'Bulandshahr', 'Chandauli', 'Chitrakoot', 'Deoria', 'Etah',
+        'Etawah', 'Farrukhabad', 'Fatehpur', 'Firozabad', 'Gautam Buddha Nagar', 'Ghaziabad',
+        'Ghazipur', 'Gonda', 'Gorakhpur', 'Hamirpur', 'Hapur', 'Hardoi', 'Hathras', 'Jalaun',
+        'Jaunpur', 'Jhansi', 'Kannauj', 'Kanpur Dehat', 'Kanpur Nagar', 'Kasganj', 'Kaushambi',
+        'Kheri', 'Kushinagar', 'Lalitpur', 'Lucknow', 'Maharajganj', 'Mahoba', 'Mainpuri',
+        'Mathura', 'Mau', 'Meerut', 'Mirzapur', 'Moradabad', 'Muzaffarnagar', 'Pilibhit',
+        'Pratapgarh', 'Prayagraj', 'Raebareli', 'Rampur', 'Saharanpur', 'Sambhal', 'Sant Kabir Nagar',
+        'Shahjahanpur', 'Shamli', 'Shravasti', 'Siddharthnagar', 'Sitapur', 'Sonbhadra',
+        'Sultanpur', 'Unnao', 'Varanasi'
+    ],
+    'Bihar': [
+        'Araria', 'Arwal', 'Aurangabad', 'Banka', 'Begusarai', 'Bhagalpur', 'Bhojpur', 'Buxar',
+        'Darbhanga', 'East Champaran', 'Gaya', 'Gopalganj', 'Jamui', 'Jehanabad', 'Kaimur',
+        'Katihar', 'Khagaria', 'Kishanganj', 'Lakhisarai', 'Madhepura', 'Madhubani', 'Munger',
+        'Muzaffarpur', 'Nalanda', 'Nawada', 'Patna', 'Purnia', 'Rohtas', 'Saharsa', 'Samastipur',
+        'Saran', 'Sheikhpura', 'Sheohar', 'Sitamarhi', 'Siwan', 'Supaul', 'Vaishali', 'West Champaran'
+    ],
+    'West Bengal': [
+        'Alipurduar', 'Bankura', 'Birbhum', 'Cooch Behar', 'Dakshin Dinajpur', 'Darjeeling',
+        'Hooghly', 'Howrah', 'Jalpaiguri', 'Jhargram', 'Kalimpong', 'Kolkata', 'Malda',
+        'Murshidabad', 'Nadia', 'North 24 Parganas', 'Paschim Bardhaman', 'Paschim Medinipur',
+        'Purba Bardhaman', 'Purba Medinipur', 'Purulia', 'South 24 Parganas', 'Uttar Dinajpur'
+    ]
+}
+
+
+# States covered by the state-wise summary
+SUMMARY_STATES = [
+    'Andhra Pradesh', 'Assam', 'Bihar', 'Chhattisgarh', 'Delhi', 
+    'Gujarat', 'Haryana', 'Karnataka', 'Kerala', 'Madhya Pradesh',
+    'Maharashtra', 'Odisha', 'Punjab', 'Rajasthan', 'Tamil Nadu',
+    'Telangana', 'Uttar Pradesh', 'West Bengal'
+]
+
 
 class IDSPDataService:
     """Service class for integrating with IDSP live weekly surveillance data"""
     
-    def __init__(self, api_key: str = None, base_url: str = None):
+    def __init__(self, api_key: str = None, base_url: str = None,
+                 detector: OutbreakDetector = None, store: SurveillanceStore = None,
+                 cache: SurveillanceCache = None, http: HTTPClient = None):
         self.api_key = api_key
         self.base_url = base_url or "https://idsp.nic.in/api/"
-        self.session = requests.Session()
+        # Pooled connections, timeouts, retries and the IDSP circuit breaker
+        self.http = http or HTTPClient()
+        # Sent with each call; the pooled session is shared with other upstreams
+        self.headers = {}
+        self.detector = detector or OutbreakDetector()
+        # Ingested weeks are read from the store instead of the network
+        self.store = store
+        # Responses for closed weeks are reused indefinitely, the open week briefly
+        self.cache = cache if cache is not None else SurveillanceCache()
+        # Concurrent fan-out; keeps its session (and connections) across calls
+        self.async_client = AsyncIDSPClient(self)
+        # States whose detector series were seeded with history
+        self._seeded = set()
+        self._seeding = SingleFlight()
         
         if self.api_key:
-            self.session.headers.update({
+            self.headers.update({
                 'Authorization': f'Bearer {self.api_key}',
                 'Content-Type': 'application/json'
             })
 
+    @memoized
     def get_weekly_surveillance_data(self, state: str = None, district: str = None, 
                                    week: int = None, year: int = None) -> Dict:
         """
@@ -37,11 +107,34 @@ class IDSPDataService:
         Returns:
             Dict containing surveillance data
         """
-        if not week:
-            week = datetime.now().isocalendar()[1]
-        if not year:
-            year = datetime.now().year
+        week, year = self.resolve_week(week, year)
+        
+        stored = self.read_through(state, district, week, year)
+        if stored is not None:
+            return stored
             
+        try:
+            week_data = self.fetch_weekly_surveillance(state, district, week, year)
+        except Exception as e:
+            print(f"IDSP API error: {e}")
+            return self.get_fallback_data(state or 'India')
+        
+        self.write_through(state, district, week, year, week_data)
+        return week_data
+
+    def fetch_weekly_surveillance(self, state: str = None, district: str = None,
+                                  week: int = None, year: int = None) -> Dict:
+        """Fetch and parse one week from the IDSP API, raising if it is unavailable"""
+        endpoint, params = self.weekly_request(state, district, week, year)
+        
+        response = self.http.get('idsp', endpoint, params=params, headers=self.headers)
+        if response.status_code != 200:
+            raise requests.HTTPError(f"IDSP returned status {response.status_code}")
+        return self.parse_surveillance_response(response.json())
+
+    def weekly_request(self, state: str = None, district: str = None,
+                       week: int = None, year: int = None) -> Tuple[str, Dict]:
+        """Endpoint and query parameters of a weekly surveillance request"""
         endpoint = f"{self.base_url}weekly-surveillance"
         params = {
             'week': week,
@@ -53,17 +146,67 @@ class IDSPDataService:
             params['state'] = state
         if district:
             params['district'] = district
-            
-        try:
-            response = self.session.get(endpoint, params=params)
-            if response.status_code == 200:
-                return self.parse_surveillance_response(response.json())
-            else:
-                return self.get_fallback_data(state or 'India')
-        except Exception as e:
-            print(f"IDSP API error: {e}")
-            return self.get_fallback_data(state or 'India')
+        
+        return endpoint, params
+
+    @staticmethod
+    def resolve_week(week: int = None, year: int = None) -> Tuple[int, int]:
+        """Default a missing week/year to the current ones; years are ISO years"""
+        current_year, current_week = current_epi_week()
+        return week or current_week, year or current_year
+
+    def read_through(self, state: str, district: str, week: int, year: int) -> Optional[Dict]:
+        """Stored or cached copy of a week, None if it has to be fetched"""
+        if self.store is not None and not district:
+            stored = self.get_stored_surveillance_data(state, week, year)
+            if stored is not None:
+                return stored
+        return self.cache.get(state, district, week, year)
 
+    def write_through(self, state: str, district: str, week: int, year: int,
+                      week_data: Dict) -> None:
+        """Record a fetched week so later callers read it from the store or cache"""
+        self.cache.put(state, district, week, year, week_data,
+                       closed=week_is_final(year, week, bool(week_data.get('surveillance_data'))))
+
+        if self.store is not None and not district:
+            self.store.write_weeks([(state or 'India', year, week,
+                                     normalize_rows(week_data, state, year, week))])
+
+    def get_stored_surveillance_data(self, state: str, week: int, year: int) -> Optional[Dict]:
+        """Weekly surveillance data from the local store, or None if the week was not ingested"""
+        checkpoint = self.store.checkpoint(state or 'India', year, week)
+        if checkpoint is None:
+            return None
+        if not checkpoint['closed']:
+            age = datetime.now() - datetime.fromisoformat(checkpoint['fetched_at'])
+            if age.total_seconds() > OPEN_WEEK_MAX_AGE:
+                return None
+        
+        rows = self.store.read_week(state or 'India', year, week) or []
+        return {
+            'surveillance_data': [
+                {
+                    'disease_name': row['disease'],
+                    'cases_reported': int(row['cases']),
+                    'deaths_reported': int(row['deaths']),
+                    'alert_level': row['alert_level'],
+                    'state': row['state'],
+                    'district': row['district'],
+                    'epi_week': int(row['week']),
+                    'trend': row['trend']
+                }
+                for row in rows
+            ],
+            'metadata': {
+                'week': week,
+                'year': year,
+                'last_updated': checkpoint['fetched_at'],
+                'source': 'IDSP - Integrated Disease Surveillance Programme (local store)'
+            }
+        }
+
+    @memoized
     def get_disease_alerts(self, disease: str = None, state: str = None, 
                           alert_level: str = None) -> List[Dict]:
         """
@@ -88,7 +231,7 @@ class IDSPDataService:
             params['alert_level'] = alert_level
             
         try:
-            response = self.session.get(endpoint, params=params)
+            response = self.http.get('idsp', endpoint, params=params, headers=self.headers)
             if response.status_code == 200:
                 return response.json().get('alerts', [])
             else:
@@ -108,28 +251,74 @@ class IDSPDataService:
         Returns:
             Dict containing outbreak summary
         """
-        current_week = datetime.now().isocalendar()[1]
-        current_year = datetime.now().year
+        oldest_week, oldest_year = self.summary_weeks(weeks_back)[-1]
+        self.seed_detector(state, oldest_year, oldest_week)
+        return run_sync(self.async_client.get_outbreak_summary(state, weeks_back))
+
+    def seed_detector(self, state: str, year: int, week: int) -> None:
+        """
+        Feed the weeks before (year, week) into the outbreak detector, oldest first
+
+        The detector ignores weeks older than the latest it has seen for a
+        series, so history has to be applied before a state's first scored
+        week. Runs once per state; concurrent callers wait for it.
+
+        Args:
+            state: State name
+            year: ISO year of the first week that will be scored
+            week: ISO week of the first week that will be scored
+        """
+        if (state or 'India') in self._seeded:
+            return
+        self._seeding.do(state or 'India', self._seed_history, state, year, week)
+
+    def _seed_history(self, state: str, year: int, week: int) -> None:
+        if (state or 'India') in self._seeded:
+            return
+
+        periods = [(w, y) for y, w in previous_epi_weeks(DETECTOR_HISTORY_WEEKS + 1, year, week)[1:]]
+        # Read from the store or cache where possible, fetched concurrently otherwise
+        history = run_sync(self.async_client.get_weeks(state, periods))
+
+        seeded = False
+        for (w, y), week_data in reversed(list(zip(periods, history))):
+            if not self.is_fallback(week_data):
+                self.detect_anomalies(week_data, w, y, state)
+                seeded = True
+
+        # Without any real history (IDSP down) try again on a later request
+        if seeded:
+            self._seeded.add(state or 'India')
+
+    @staticmethod
+    def summary_weeks(weeks_back: int) -> List[Tuple[int, int]]:
+        """(week, year) pairs covered by an outbreak summary, newest first"""
+        return [(week, year) for year, week in previous_epi_weeks(weeks_back)]
+
+    def summarize_outbreaks(self, state: str, weeks_back: int,
+                            weeks: List[Tuple[int, int, Dict]]) -> Dict:
+        """Build the outbreak summary from (week, year, data) tuples, newest first"""
+        current_year, current_week = current_epi_week()
         
         outbreaks = []
         trends = {}
         
-        for i in range(weeks_back):
-            week = current_week - i
-            year = current_year
-            
-            # Handle year boundary
-            if week <= 0:
-                week = 52 + week
-                year = current_year - 1
-                
-            week_data = self.get_weekly_surveillance_data(state, week=week, year=year)
-            
+        # Feed the detector oldest week first; weeks it has already seen are skipped
+        anomalies = {}
+        for week, year, week_data in reversed(weeks):
+            for alert in self.detect_anomalies(week_data, week, year, state):
+                anomalies[(alert['disease'], alert['district'], week, year)] = alert
+        
+        for week, year, week_data in weeks:
             if week_data.get('surveillance_data'):
                 for disease_data in week_data['surveillance_data']:
                     disease = disease_data.get('disease_name', '')
                     cases = disease_data.get('cases_reported', 0)
                     alert_level = disease_data.get('alert_level', 'normal')
+                    anomaly = anomalies.get((disease, self._series_location(disease_data, state),
+                                             week, year))
+                    if anomaly and alert_level not in ['high', 'outbreak']:
+                        alert_level = anomaly['alert_level']
                     
                     if alert_level in ['high', 'outbreak']:
                         outbreaks.append({
@@ -149,10 +338,66 @@ class IDSPDataService:
         return {
             'active_outbreaks': outbreaks,
             'disease_trends': trends,
-            'summary_period': f"Week {current_week-weeks_back+1} to {current_week}, {current_year}",
+            'detected_anomalies': list(anomalies.values()),
+            'summary_period': self.summary_period(weeks, current_week, current_year),
             'total_outbreaks': len(outbreaks)
         }
 
+    @staticmethod
+    def summary_period(weeks: List[Tuple[int, int, Dict]], current_week: int,
+                       current_year: int) -> str:
+        """Label of the weeks a summary covers, spanning year boundaries"""
+        first_week, first_year = (weeks[-1][0], weeks[-1][1]) if weeks else (current_week, current_year)
+        if first_year == current_year:
+            return f"Week {first_week} to {current_week}, {current_year}"
+        return f"Week {first_week}, {first_year} to {current_week}, {current_year}"
+
+    def detect_anomalies(self, week_data: Dict, week: int, year: int,
+                         state: str = None) -> List[Dict]:
+        """
+        Feed one week of surveillance records into the outbreak detector
+        
+        Args:
+            week_data: Parsed weekly surveillance data
+            week: Epidemiological week of the data
+            year: Year of the epidemiological week
+            state: State the data was requested for
+        
+        Returns:
+            List of alert events raised for the week
+        """
+        # Mock records would become the series' baseline
+        if self.is_fallback(week_data):
+            return []
+        
+        # Counts of a week still being reported are scored but kept out of the
+        # baseline until the week is final
+        records = week_data.get('surveillance_data', [])
+        return self.detector.update_many(
+            [
+                {
+                    'disease': disease_data.get('disease_name', ''),
+                    'district': self._series_location(disease_data, state),
+                    'state': disease_data.get('state') or state,
+                    'cases': disease_data.get('cases_reported', 0),
+                    'week': week,
+                    'year': year
+                }
+                for disease_data in records
+            ],
+            commit=week_is_final(year, week, bool(records))
+        )
+
+    @staticmethod
+    def is_fallback(week_data: Dict) -> bool:
+        """Whether weekly data is the mock payload served while IDSP is unavailable"""
+        return bool(week_data.get('metadata', {}).get('fallback'))
+
+    @staticmethod
+    def _series_location(disease_data: Dict, state: str = None) -> str:
+        """Most specific location a surveillance record is reported for"""
+        return disease_data.get('district') or disease_data.get('state') or state or 'India'
+
     def parse_surveillance_response(self, data: Dict) -> Dict:
         """Parse IDSP surveillance response"""
         parsed_data = {
@@ -184,21 +429,7 @@ class IDSPDataService:
     def map_destination_to_state(self, destination: str) -> str:
         """Map travel destination to Indian state for IDSP data - UP specific"""
         # All UP districts map to Uttar Pradesh state
-        up_districts = [
-            'Agra', 'Aligarh', 'Ambedkar Nagar', 'Amethi', 'Amroha', 'Auraiya', 'Ayodhya', 'Azamgarh',
-            'Baghpat', 'Bahraich', 'Ballia', 'Balrampur', 'Banda', 'Barabanki', 'Bareilly', 'Basti',
-            'Bhadohi', 'Bijnor', 'Budaun', 'Bulandshahr', 'Chandauli', 'Chitrakoot', 'Deoria', 'Etah',
-            'Etawah', 'Farrukhabad', 'Fatehpur', 'Firozabad', 'Gautam Buddha Nagar', 'Ghaziabad',
-            'Ghazipur', 'Gonda', 'Gorakhpur', 'Hamirpur', 'Hapur', 'Hardoi', 'Hathras', 'Jalaun',
-            'Jaunpur', 'Jhansi', 'Kannauj', 'Kanpur Dehat', 'Kanpur Nagar', 'Kasganj', 'Kaushambi',
-            'Kheri', 'Kushinagar', 'Lalitpur', 'Lucknow', 'Maharajganj', 'Mahoba', 'Mainpuri',
-            'Mathura', 'Mau', 'Meerut', 'Mirzapur', 'Moradabad', 'Muzaffarnagar', 'Pilibhit',
-            'Pratapgarh', 'Prayagraj', 'Raebareli', 'Rampur', 'Saharanpur', 'Sambhal', 'Sant Kabir Nagar',
-            'Shahjahanpur', 'Shamli', 'Shravasti', 'Siddharthnagar', 'Sitapur', 'Sonbhadra',
-            'Sultanpur', 'Unnao', 'Varanasi'
-        ]
-        
-        if destination in up_districts:
+        if destination in STATE_DISTRICTS['Uttar Pradesh']:
             return 'Uttar Pradesh'
         
         # Fallback mapping for other states
@@ -214,37 +445,56 @@ class IDSPDataService:
 
     def get_state_wise_summary(self, disease: str = None) -> Dict:
         """Get state-wise disease summary"""
-        states = [
-            'Andhra Pradesh', 'Assam', 'Bihar', 'Chhattisgarh', 'Delhi', 
-            'Gujarat', 'Haryana', 'Karnataka', 'Kerala', 'Madhya Pradesh',
-            'Maharashtra', 'Odisha', 'Punjab', 'Rajasthan', 'Tamil Nadu',
-            'Telangana', 'Uttar Pradesh', 'West Bengal'
-        ]
+        return run_sync(self.async_client.get_state_wise_summary(SUMMARY_STATES, disease))
+
+    def stored_state_summaries(self, states: List[str]) -> Tuple[set, Dict]:
+        """
+        Summarise the current week of every state ingested into the store
         
-        state_summary = {}
-        
-        for state in states:
-            try:
-                state_data = self.get_weekly_surveillance_data(state=state)
-                if state_data.get('surveillance_data'):
-                    state_summary[state] = {
-                        'total_cases': sum(d.get('cases_reported', 0) 
-                                         for d in state_data['surveillance_data']),
-                        'active_diseases': len(state_data['surveillance_data']),
-                        'high_alerts': len([d for d in state_data['surveillance_data'] 
-                                          if d.get('alert_level') == 'high']),
-                        'outbreak_alerts': len([d for d in state_data['surveillance_data'] 
-                                              if d.get('alert_level') == 'outbreak'])
-                    }
-            except Exception as e:
-                print(f"Error fetching data for {state}: {e}")
-                continue
-        
-        return state_summary
+        Args:
+            states: States to summarise
+        
+        Returns:
+            Tuple of the ingested states and their summaries (states without
+            rows are ingested but have no summary)
+        """
+        stored_summary = {}
+        ingested = set()
+        
+        if self.store is not None:
+            # Summarise every ingested state with one query over the store
+            year, week = current_epi_week()
+            ingested = {state for state in states
+                        if self.store.checkpoint(state, year, week) is not None}
+            rows = self.store.query(states=list(ingested), weeks=[(year, week)])
+            for state, group in rows.groupby('partition', observed=True):
+                stored_summary[str(state)] = {
+                    'total_cases': int(group['cases'].sum()),
+                    'active_diseases': len(group),
+                    'high_alerts': int((group['alert_level'] == 'high').sum()),
+                    'outbreak_alerts': int((group['alert_level'] == 'outbreak').sum())
+                }
+        
+        return ingested, stored_summary
+
+    @staticmethod
+    def summarize_state(state_data: Dict) -> Optional[Dict]:
+        """Case and alert totals of one state's weekly data, None if it has no records"""
+        if not state_data.get('surveillance_data'):
+            return None
+        return {
+            'total_cases': sum(d.get('cases_reported', 0) 
+                             for d in state_data['surveillance_data']),
+            'active_diseases': len(state_data['surveillance_data']),
+            'high_alerts': len([d for d in state_data['surveillance_data'] 
+                              if d.get('alert_level') == 'high']),
+            'outbreak_alerts': len([d for d in state_data['surveillance_data'] 
+                                  if d.get('alert_level') == 'outbreak'])
+        }
 
     def get_fallback_data(self, location: str) -> Dict:
         """Fallback data when IDSP API is unavailable"""
-        current_week = datetime.now().isocalendar()[1]
+        current_year, current_week = current_epi_week()
         
         # Enhanced fallback data based on actual IDSP patterns
         fallback_data = {
@@ -278,10 +528,11 @@ class IDSPDataService:
             **location_data,
             'metadata': {
                 'week': current_week,
-                'year': datetime.now().year,
+                'year': current_year,
                 'last_updated': datetime.now().isoformat(),
                 'source': 'IDSP Fallback Data - Mock surveillance patterns',
-                'note': 'Using fallback data - IDSP API unavailable'
+                'note': 'Using fallback data - IDSP API unavailable',
+                'fallback': True
             }
         }
 
@@ -325,6 +576,13 @@ class IDSPDataService:
         surveillance_data = self.get_weekly_surveillance_data(state=location)
         alerts = self.get_disease_alerts(state=location)
         
+        current_year, current_week = current_epi_week()
+        self.seed_detector(location, current_year, current_week)
+        anomalies = {
+            (alert['disease'], alert['district']): alert
+            for alert in self.detect_anomalies(surveillance_data, current_week, current_year, location)
+        }
+        
         # Extract diseases with high/outbreak alerts
         high_risk_diseases = []
         medium_risk_diseases = []
@@ -334,15 +592,21 @@ class IDSPDataService:
                 disease = disease_data.get('disease_name', '')
                 alert_level = disease_data.get('alert_level', 'normal')
                 cases = disease_data.get('cases_reported', 0)
+                series_location = self._series_location(disease_data, location)
+                
+                # Fixed case thresholds only apply until the detector has a baseline
+                cold = not self.detector.is_warm(disease, series_location)
                 
-                if alert_level in ['high', 'outbreak'] or cases > 500:
+                if (alert_level in ['high', 'outbreak'] or (disease, series_location) in anomalies
+                        or (cold and cases > 500)):
                     high_risk_diseases.append(disease)
-                elif alert_level == 'medium' or cases > 100:
+                elif alert_level == 'medium' or (cold and cases > 100):
                     medium_risk_diseases.append(disease)
         
         return {
             'high_risk_diseases': high_risk_diseases,
             'medium_risk_diseases': medium_risk_diseases,
+            'anomaly_alerts': list(anomalies.values()),
             'active_alerts': len(alerts),
             'surveillance_week': surveillance_data.get('metadata', {}).get('week', ''),
             'last_updated': surveillance_data.get('metadata', {}).get('last_updated', ''),
@@ -0,0 +1,221 @@
+"""
+Model Registry Module
+Keeps fitted forecasting models keyed by the series they were fitted on, so
+repeated forecasts for unchanged data skip the Prophet fit entirely
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+from prophet.serialize import model_from_json, model_to_json
+
+logger = logging.getLogger(__name__)
+
+
+def series_fingerprint(prophet_data: pd.DataFrame) -> str:
+    """Stable hash of a prepared ('ds', 'y') series, independent of column dtypes"""
+    digest = hashlib.sha1()
+    digest.update(prophet_data['ds'].to_numpy(dtype='datetime64[ns]').view('i8').tobytes())
+    digest.update(prophet_data['y'].to_numpy(dtype='float64').tobytes())
+    return digest.hexdigest()
+
+
+def params_fingerprint(model_params: Dict) -> str:
+    """Stable hash of a model parameter dict"""
+    encoded = json.dumps(model_params, sort_keys=True, default=str)
+    return hashlib.sha1(encoded.encode('utf-8')).hexdigest()
+
+
+class ModelRegistry:
+    """LRU registry of fitted models with optional on-disk persistence"""
+
+    def __init__(self, max_models: int = 32, cache_dir: str = None):
+        """
+        Initialize the model registry
+
+        Args:
+            max_models (int): Maximum number of fitted models held in memory
+            cache_dir (str, optional): Directory where fitted models are persisted
+                so that a restarted worker can reload them instead of refitting
+        """
+        self.max_models = max_models
+        self.cache_dir = cache_dir
+        self._models = OrderedDict()
+        self._latest = {}
+        self._lock = threading.RLock()
+
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self._latest = self._load_index()
+
+    @staticmethod
+    def make_key(disease: Optional[str], location: Optional[str],
+                 prophet_data: pd.DataFrame, model_params: Dict) -> Tuple[str, str, str, str]:
+        """
+        Build the registry key for a series
+
+        Args:
+            disease (str, optional): Disease name
+            location (str, optional): Location identifier
+            prophet_data (pd.DataFrame): Prepared data with 'ds' and 'y' columns
+            model_params (dict): Parameters the model is fitted with
+
+        Returns:
+            tuple: (disease, location, series hash, params hash)
+        """
+        return (
+            disease or 'default',
+            location or 'default',
+            series_fingerprint(prophet_data),
+            params_fingerprint(model_params)
+        )
+
+    def get(self, key: Tuple[str, str, str, str]):
+        """Return the fitted model for a key, or None if it has to be fitted"""
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                self._models.move_to_end(key)
+                return model
+
+        model = self._load(key)
+        if model is not None:
+            self._remember(key, model)
+        return model
+
+    def put(self, key: Tuple[str, str, str, str], model) -> None:
+        """
+        Register a fitted model, evicting the least recently used one if full
+
+        Only the latest model of a series is kept on disk; the file of the
+        model it replaces is deleted, as its data window is not asked for again.
+        """
+        self._remember(key, model)
+        self._save(key, model)
+
+        series = (key[0], key[1], key[3])
+        with self._lock:
+            replaced = self._latest.get(series)
+            self._latest[series] = key
+        self._save_index()
+
+        if replaced is not None and replaced != key:
+            self._delete(replaced)
+
+    def latest(self, disease: Optional[str], location: Optional[str], model_params: Dict):
+        """
+        Return the most recently fitted model for a series, whatever data it saw
+
+        Args:
+            disease (str, optional): Disease name
+            location (str, optional): Location identifier
+            model_params (dict): Parameters the model was fitted with
+
+        Returns:
+            Prophet: Fitted model, or None if the series was never fitted
+        """
+        series = (disease or 'default', location or 'default', params_fingerprint(model_params))
+        with self._lock:
+            key = self._latest.get(series)
+        return self.get(key) if key else None
+
+    def clear(self) -> None:
+        """Drop all in-memory models (persisted models are kept)"""
+        with self._lock:
+            self._models.clear()
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            return key in self._models
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._models)
+
+    def _remember(self, key, model) -> None:
+        with self._lock:
+            self._models[key] = model
+            self._models.move_to_end(key)
+            while len(self._models) > self.max_models:
+                evicted, _ = self._models.popitem(last=False)
+                logger.info(f"Evicted fitted model {evicted[:2]} from registry")
+
+    def _index_path(self) -> str:
+        return os.path.join(self.cache_dir, 'index.json')
+
+    def _load_index(self) -> Dict:
+        try:
+            with open(self._index_path(), 'r') as f:
+                return {tuple(series): tuple(key) for series, key in json.load(f)}
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"Could not load model index: {e}")
+            return {}
+
+    def _save_index(self) -> None:
+        if not self.cache_dir:
+            return
+
+        with self._lock:
+            entries = [[list(series), list(key)] for series, key in self._latest.items()]
+
+        path = self._index_path()
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(entries, f)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Could not persist model index: {e}")
+
+    def _path(self, key) -> str:
+        digest = hashlib.sha1('|'.join(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+    def _load(self, key):
+        if not self.cache_dir:
+            return None
+
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, 'r') as f:
+                return model_from_json(f.read())
+        except Exception as e:
+            logger.warning(f"Could not load persisted model {path}: {e}")
+            return None
+
+    def _save(self, key, model) -> None:
+        if not self.cache_dir:
+            return
+
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                f.write(model_to_json(model))
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Could not persist model to {path}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _delete(self, key) -> None:
+        if not self.cache_dir:
+            return
+
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Could not delete persisted model {key[:2]}: {e}")
@@ -0,0 +1,164 @@
+"""
+Outbreak Detector Module
+Online anomaly detection over weekly surveillance counts using an EWMA
+baseline and a one-sided CUSUM, with constant memory per (disease, district)
+"""
+
+import math
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+
+class SeriesState:
+    """Rolling detector state for one (disease, district) series"""
+
+    __slots__ = ('count', 'mean', 'var', 'cusum', 'last_period', 'last_alert')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.var = 0.0
+        self.cusum = 0.0
+        self.last_period = None
+        self.last_alert = None
+
+    def copy(self) -> 'SeriesState':
+        state = SeriesState()
+        for name in self.__slots__:
+            setattr(state, name, getattr(self, name))
+        return state
+
+
+class OutbreakDetector:
+    """Incremental EWMA/CUSUM outbreak detector for many weekly series"""
+
+    def __init__(self, alpha: float = 0.2, z_threshold: float = 3.0, cusum_k: float = 0.5,
+                 cusum_h: float = 4.0, warmup: int = 4, min_cases: int = 5):
+        """
+        Initialize the detector
+
+        Args:
+            alpha: EWMA smoothing factor for the baseline mean and variance
+            z_threshold: Standardised excess over the baseline that raises an alert
+            cusum_k: CUSUM allowance (in baseline standard deviations) per week
+            cusum_h: CUSUM decision threshold for sustained smaller increases
+            warmup: Weeks observed before a series can raise alerts
+            min_cases: Weekly counts below this never raise alerts
+        """
+        self.alpha = alpha
+        self.z_threshold = z_threshold
+        self.cusum_k = cusum_k
+        self.cusum_h = cusum_h
+        self.warmup = warmup
+        self.min_cases = min_cases
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def update(self, disease: str, district: str, cases: float, week: int = None,
+               year: int = None, state: str = None, commit: bool = True) -> Optional[Dict]:
+        """
+        Feed one weekly count into the detector
+
+        Records for a week at or before the last week committed for the series
+        are not applied again; the alert computed for the latest week is
+        returned instead, so overlapping re-scans are cheap and idempotent.
+
+        Args:
+            disease: Disease name
+            district: District (or state, for state-level data) the count is for
+            cases: Cases reported in the week
+            week: Epidemiological week
+            year: Year of the epidemiological week
+            state: State name, carried into alert events
+            commit: Whether the count is final and joins the baseline; counts
+                of a week still being reported are scored against the baseline
+                without changing it, so later revisions are scored again
+
+        Returns:
+            Dict describing the alert, or None if the week looks normal
+        """
+        key = (disease, district)
+        period = (year, week) if week is not None and year is not None else None
+
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = SeriesState()
+
+            if period is not None and series.last_period is not None:
+                if period == series.last_period:
+                    return series.last_alert
+                if period < series.last_period:
+                    return None
+
+            if not commit:
+                series = series.copy()
+
+            cases = float(cases or 0)
+            alert = None
+
+            if series.count == 0:
+                series.mean = cases
+            else:
+                std = math.sqrt(series.var) if series.var > 0 else max(math.sqrt(series.mean), 1.0)
+                z_score = (cases - series.mean) / std
+                series.cusum = max(0.0, series.cusum + z_score - self.cusum_k)
+
+                if series.count >= self.warmup and cases >= self.min_cases:
+                    if z_score > self.z_threshold or series.cusum > self.cusum_h:
+                        alert = {
+                            'disease': disease,
+                            'district': district,
+                            'state': state,
+                            'week': week,
+                            'year': year,
+                            'cases': cases,
+                            'expected': round(series.mean, 2),
+                            'z_score': round(z_score, 2),
+                            'cusum': round(series.cusum, 2),
+                            'method': 'ewma' if z_score > self.z_threshold else 'cusum',
+                            'alert_level': 'outbreak' if z_score > 2 * self.z_threshold else 'high',
+                            'detected_at': datetime.now().isoformat()
+                        }
+                        series.cusum = 0.0
+
+                diff = cases - series.mean
+                series.mean += self.alpha * diff
+                series.var = (1 - self.alpha) * (series.var + self.alpha * diff * diff)
+
+            series.count += 1
+            series.last_period = period
+            series.last_alert = alert
+            return alert
+
+    def update_many(self, records: Iterable[Dict], commit: bool = True) -> List[Dict]:
+        """
+        Feed a stream of records in chronological order
+
+        Args:
+            records: Dicts with 'disease', 'district', 'cases' and optional
+                'week', 'year' and 'state' keys
+            commit: Whether the counts are final (see update)
+
+        Returns:
+            List of alert events raised by the records
+        """
+        alerts = []
+        for record in records:
+            alert = self.update(record['disease'], record['district'], record['cases'],
+                                week=record.get('week'), year=record.get('year'),
+                                state=record.get('state'), commit=commit)
+            if alert is not None:
+                alerts.append(alert)
+        return alerts
+
+    def is_warm(self, disease: str, district: str) -> bool:
+        """Whether the committed baseline of a series is long enough to raise alerts"""
+        with self._lock:
+            series = self._series.get((disease, district))
+            return series is not None and series.count >= self.warmup
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._series)
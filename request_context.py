@@ -0,0 +1,85 @@
+"""
+Request Context Module
+Request-scoped memoization: within a request_scope(), calls to memoized
+methods with identical arguments run once and later calls reuse the result
+"""
+
+import contextvars
+import functools
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable
+
+_current = contextvars.ContextVar('request_memo', default=None)
+
+
+class RequestMemo:
+    """Results of the upstream calls made while serving one request"""
+
+    def __init__(self):
+        self._results = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get_or_call(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Return the result recorded for key, calling fn to produce it the first time"""
+        with self._lock:
+            if key in self._results:
+                self._hits += 1
+                return self._results[key]
+
+        # Not held while calling: fn may itself call memoized methods
+        result = fn()
+        with self._lock:
+            self._misses += 1
+            return self._results.setdefault(key, result)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'hits': self._hits, 'misses': self._misses, 'entries': len(self._results)}
+
+
+def current_memo():
+    """Memo of the active request scope, or None outside of one"""
+    return _current.get()
+
+
+@contextmanager
+def request_scope():
+    """
+    Open a request scope for memoized calls
+
+    Nested scopes share the outermost memo, so a helper that opens its own
+    scope still reuses results from the request it is serving.
+    """
+    memo = _current.get()
+    if memo is not None:
+        yield memo
+        return
+
+    memo = RequestMemo()
+    token = _current.set(memo)
+    try:
+        yield memo
+    finally:
+        _current.reset(token)
+
+
+def memoized(method: Callable) -> Callable:
+    """
+    Memoize a method for the duration of the active request scope
+
+    Calls are keyed by the instance, the method and its arguments, which must
+    be hashable; outside of a scope the method runs as usual.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        memo = _current.get()
+        if memo is None:
+            return method(self, *args, **kwargs)
+
+        key = (id(self), method.__qualname__, args, tuple(sorted(kwargs.items())))
+        return memo.get_or_call(key, lambda: method(self, *args, **kwargs))
+
+    return wrapper
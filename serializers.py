@@ -0,0 +1,220 @@
+"""
+Serializers Module
+Response encodings for forecast DataFrames: row records (default), columnar
+JSON with epoch dates, and Apache Arrow IPC / Parquet for programmatic clients
+"""
+
+import io
+import json
+
+import numpy as np
+import pandas as pd
+from flask import Response, jsonify
+
+try:
+    import orjson
+except ImportError:  # optional fast JSON encoder
+    orjson = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional, needed for the arrow and parquet formats
+    pa = None
+    pq = None
+
+FORMATS = ('records', 'columnar', 'arrow', 'parquet')
+
+ARROW_MIMETYPE = 'application/vnd.apache.arrow.stream'
+PARQUET_MIMETYPE = 'application/vnd.apache.parquet'
+
+# Accept header values mapped to formats, in order of preference for */*
+ACCEPT_FORMATS = {
+    'application/json': 'records',
+    ARROW_MIMETYPE: 'arrow',
+    PARQUET_MIMETYPE: 'parquet',
+    'application/x-parquet': 'parquet'
+}
+
+
+def negotiate_format(request) -> str:
+    """
+    Pick the response format from the `format` query parameter or the Accept header
+
+    Args:
+        request: Flask request
+
+    Returns:
+        str: One of FORMATS
+
+    Raises:
+        ValueError: If an unknown format, or arrow/parquet without pyarrow,
+            is requested explicitly
+    """
+    fmt = request.args.get('format')
+    if fmt is None and request.is_json:
+        fmt = (request.get_json(silent=True) or {}).get('format')
+
+    if fmt is None:
+        offered = [mimetype for mimetype, name in ACCEPT_FORMATS.items()
+                   if pa is not None or name == 'records']
+        best = request.accept_mimetypes.best_match(offered)
+        fmt = ACCEPT_FORMATS.get(best, 'records')
+
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format '{fmt}', expected one of: {', '.join(FORMATS)}")
+    if fmt in ('arrow', 'parquet') and pa is None:
+        raise ValueError(f"Format '{fmt}' is not available: pyarrow is not installed")
+
+    return fmt
+
+
+def dumps(payload) -> bytes:
+    """Encode JSON with orjson when available (NaN becomes null either way)"""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(payload, default=_json_default).encode('utf-8')
+
+
+def _json_default(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def columnar(df: pd.DataFrame) -> dict:
+    """
+    Convert a DataFrame to one array per column
+
+    Datetime columns become epoch milliseconds and missing values become null.
+
+    Args:
+        df (pd.DataFrame): Data to convert
+
+    Returns:
+        dict: {'columns': [...], 'data': {column: array}}
+    """
+    data = {}
+    for column in df.columns:
+        values = df[column]
+        if pd.api.types.is_datetime64_any_dtype(values):
+            data[column] = values.to_numpy(dtype='datetime64[ms]').astype('int64')
+        elif pd.api.types.is_float_dtype(values):
+            array = values.to_numpy(dtype='float64')
+            if orjson is None and np.isnan(array).any():
+                array = np.where(np.isnan(array), None, array)
+            data[column] = array
+        elif pd.api.types.is_numeric_dtype(values):
+            data[column] = values.to_numpy()
+        else:
+            data[column] = values.tolist()
+
+    if orjson is None:
+        data = {column: values.tolist() if isinstance(values, np.ndarray) else values
+                for column, values in data.items()}
+
+    return {'columns': list(df.columns), 'data': data}
+
+
+def records(df: pd.DataFrame) -> list:
+    """
+    Convert a DataFrame to one dict per row
+
+    Missing values become None, so forecast rows without actual cases encode
+    as null rather than NaN, which is not valid JSON.
+
+    Args:
+        df (pd.DataFrame): Data to convert
+
+    Returns:
+        list: Row dicts
+    """
+    return df.astype(object).where(df.notna(), None).to_dict('records')
+
+
+def _to_table(df: pd.DataFrame, metadata: dict):
+    if pa is None:
+        raise RuntimeError("pyarrow is required for the arrow and parquet formats")
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    schema_metadata = dict(table.schema.metadata or {})
+    schema_metadata[b'forecast'] = json.dumps(metadata, default=str).encode('utf-8')
+    return table.replace_schema_metadata(schema_metadata)
+
+
+def _binary_response(df: pd.DataFrame, metadata: dict, fmt: str) -> Response:
+    table = _to_table(df, metadata)
+    sink = io.BytesIO()
+
+    if fmt == 'arrow':
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        mimetype = ARROW_MIMETYPE
+    else:
+        pq.write_table(table, sink)
+        mimetype = PARQUET_MIMETYPE
+
+    return Response(sink.getvalue(), mimetype=mimetype)
+
+
+def forecast_response(metadata: dict, forecast: pd.DataFrame, fmt: str = 'records',
+                      key: str = 'forecast') -> Response:
+    """
+    Build the HTTP response for a single forecast
+
+    Args:
+        metadata (dict): Response fields other than the forecast itself
+        forecast (pd.DataFrame): Forecast rows
+        fmt (str): One of FORMATS
+        key (str): Field name the forecast is returned under in JSON formats
+
+    Returns:
+        Response: Flask response; for arrow/parquet the metadata is stored in
+            the schema metadata under 'forecast'
+    """
+    if fmt == 'records':
+        return jsonify({**metadata, key: records(forecast)})
+
+    if fmt == 'columnar':
+        return Response(dumps({**metadata, 'format': 'columnar', key: columnar(forecast)}),
+                        mimetype='application/json')
+
+    return _binary_response(forecast, metadata, fmt)
+
+
+def batch_response(metadata: dict, results: list, fmt: str = 'records') -> Response:
+    """
+    Build the HTTP response for a batch of forecasts
+
+    Args:
+        metadata (dict): Response fields other than the results
+        results (list): Per-series result dicts, successful ones holding a
+            'forecast' DataFrame
+        fmt (str): One of FORMATS
+
+    Returns:
+        Response: Flask response; arrow/parquet return one table of all
+            successful series with 'disease' and 'location' columns, and the
+            per-series errors in the schema metadata
+    """
+    if fmt in ('records', 'columnar'):
+        encode = records if fmt == 'records' else columnar
+        results = [
+            {**result, 'forecast': encode(result['forecast'])} if 'forecast' in result else result
+            for result in results
+        ]
+        if fmt == 'records':
+            return jsonify({**metadata, 'results': results})
+        return Response(dumps({**metadata, 'format': 'columnar', 'results': results}),
+                        mimetype='application/json')
+
+    frames = [
+        result['forecast'].assign(disease=result['disease'], location=result['location'])
+        for result in results if 'forecast' in result
+    ]
+    errors = [result for result in results if 'forecast' not in result]
+    table = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    return _binary_response(table, {**metadata, 'errors': errors}, fmt)
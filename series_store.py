@@ -0,0 +1,233 @@
+"""
+Series Store Module
+On-disk columnar store with one directory per (disease, location) series:
+a .npy file per column, memory-mapped read-only so date-range reads are
+zero-copy slices shared between worker processes through the page cache
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Unpublished column files older than this are leftovers of a lost write race
+STALE_SECONDS = 3600
+
+
+class SeriesStore:
+    """Regular time series persisted as memory-mapped NumPy columns"""
+
+    def __init__(self, store_dir: str, freq: str = 'D'):
+        """
+        Initialize the series store
+
+        Args:
+            store_dir (str): Directory the series are kept in
+            freq (str): Fixed sampling frequency of stored series; dates are not
+                stored but derived from each series' start date and this frequency
+        """
+        self.store_dir = store_dir
+        self.freq = freq
+        self._step = pd.tseries.frequencies.to_offset(freq).nanos
+        # series -> (meta.json identity, meta, {column: memmap}) for the mappings opened so far
+        self._mapped = {}
+        self._lock = threading.RLock()
+
+        os.makedirs(self.store_dir, exist_ok=True)
+
+    def coverage(self, disease: str, location: str) -> Optional[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """First and last stored date of a series, or None if it is not stored"""
+        mapped = self._open(disease, location)
+        if mapped is None:
+            return None
+
+        meta = mapped[1]
+        start = pd.Timestamp(meta['start'])
+        return start, start + pd.Timedelta(self._step * (meta['length'] - 1))
+
+    def read(self, disease: str, location: str, start_date=None,
+             end_date=None) -> Optional[pd.DataFrame]:
+        """
+        Read a date range of a series without copying the stored columns
+
+        Args:
+            disease (str): Disease name
+            location (str): Location identifier
+            start_date (optional): First date to return (default: first stored date)
+            end_date (optional): Last date to return (default: last stored date)
+
+        Returns:
+            pd.DataFrame: 'date' plus the stored columns, backed by read-only
+                memory maps; None if the series is not stored
+        """
+        mapped = self._open(disease, location)
+        if mapped is None:
+            return None
+
+        _, meta, columns = mapped
+        origin = pd.Timestamp(meta['start'])
+        length = meta['length']
+        lo = 0 if start_date is None else min(max(self._offset(origin, start_date), 0), length)
+        hi = length if end_date is None else min(max(self._offset(origin, end_date) + 1, lo), length)
+
+        data = {'date': pd.date_range(origin + pd.Timedelta(self._step * lo),
+                                      periods=hi - lo, freq=self.freq)}
+        for name in meta['columns']:
+            data[name] = columns[name][lo:hi]
+
+        return pd.DataFrame(data, copy=False)
+
+    def write(self, disease: str, location: str, data: pd.DataFrame) -> None:
+        """
+        Replace a stored series
+
+        Rows are aligned to the store frequency; dates missing inside the range
+        are filled with zeros. Readers holding the previous version keep a valid
+        mapping of it until they reopen the series.
+
+        Args:
+            disease (str): Disease name
+            location (str): Location identifier
+            data (pd.DataFrame): Series with a 'date' column and numeric columns
+        """
+        if data.empty:
+            raise ValueError(f"Cannot store an empty series for {disease}/{location}")
+
+        frame = data.copy()
+        frame['date'] = pd.to_datetime(frame['date']).dt.normalize()
+        frame = frame.drop_duplicates('date', keep='last').set_index('date').sort_index()
+        frame = frame.reindex(pd.date_range(frame.index[0], frame.index[-1], freq=self.freq),
+                              fill_value=0)
+
+        series_dir = self._series_dir(disease, location)
+        os.makedirs(series_dir, exist_ok=True)
+        version = uuid.uuid4().hex[:12]
+
+        # Columns are written under a new version first; swapping meta.json
+        # publishes them atomically
+        for name in frame.columns:
+            np.save(os.path.join(series_dir, f"{name}.{version}.npy"),
+                    np.ascontiguousarray(frame[name].to_numpy()))
+
+        meta = {
+            'disease': disease,
+            'location': location,
+            'start': frame.index[0].isoformat(),
+            'length': len(frame),
+            'freq': self.freq,
+            'columns': list(frame.columns),
+            'version': version,
+            'updated_at': datetime.now().isoformat()
+        }
+        meta_path = os.path.join(series_dir, 'meta.json')
+        previous = self._version(meta_path)
+        tmp_path = f"{meta_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+
+        self._remove_stale(series_dir, keep=version, previous=previous)
+        with self._lock:
+            self._mapped.pop((disease, location), None)
+
+    def merge(self, disease: str, location: str, data: pd.DataFrame) -> None:
+        """Write rows into a series, replacing stored rows for the same dates"""
+        stored = self.read(disease, location)
+        if stored is not None:
+            data = pd.concat([stored, data], ignore_index=True)
+        self.write(disease, location, data)
+
+    def delete(self, disease: str, location: str) -> bool:
+        """Remove a stored series; returns whether it existed"""
+        series_dir = self._series_dir(disease, location)
+        with self._lock:
+            self._mapped.pop((disease, location), None)
+
+        meta_path = os.path.join(series_dir, 'meta.json')
+        if not os.path.exists(meta_path):
+            return False
+
+        os.remove(meta_path)
+        self._remove_stale(series_dir, keep=None, min_age=0)
+        return True
+
+    def _offset(self, origin: pd.Timestamp, date) -> int:
+        return int((pd.Timestamp(date).normalize() - origin).value // self._step)
+
+    def _series_dir(self, disease: str, location: str) -> str:
+        digest = hashlib.sha1(f"{disease}|{location}".encode('utf-8')).hexdigest()
+        return os.path.join(self.store_dir, digest)
+
+    def _open(self, disease: str, location: str):
+        meta_path = os.path.join(self._series_dir(disease, location), 'meta.json')
+        try:
+            stat = os.stat(meta_path)
+        except FileNotFoundError:
+            return None
+
+        with self._lock:
+            mapped = self._mapped.get((disease, location))
+            # meta.json is replaced on every write, so a new inode means a new version
+            if mapped is not None and mapped[0] == (stat.st_ino, stat.st_mtime_ns):
+                return mapped
+
+        # A writer in another process may replace the version while it is being
+        # opened; the second attempt reads the new meta.json
+        for attempt in range(2):
+            try:
+                with open(meta_path, 'r') as f:
+                    meta = json.load(f)
+                series_dir = os.path.dirname(meta_path)
+                columns = {
+                    name: np.load(os.path.join(series_dir, f"{name}.{meta['version']}.npy"),
+                                  mmap_mode='r')
+                    for name in meta['columns']
+                }
+                break
+            except FileNotFoundError:
+                if attempt:
+                    return None
+            except Exception as e:
+                logger.warning(f"Could not open stored series {disease}/{location}: {e}")
+                return None
+
+        mapped = ((stat.st_ino, stat.st_mtime_ns), meta, columns)
+        with self._lock:
+            self._mapped[(disease, location)] = mapped
+        return mapped
+
+    @staticmethod
+    def _version(meta_path: str) -> Optional[str]:
+        try:
+            with open(meta_path, 'r') as f:
+                return json.load(f)['version']
+        except Exception:
+            return None
+
+    @staticmethod
+    def _remove_stale(series_dir: str, keep: Optional[str], previous: Optional[str] = None,
+                      min_age: float = STALE_SECONDS) -> None:
+        # The replaced version goes right away; other unpublished files may belong
+        # to a concurrent writer about to publish them, so they are only removed
+        # once old. Mapped readers are unaffected: unlinked files stay valid
+        cutoff = time.time() - min_age
+        for filename in os.listdir(series_dir):
+            version = filename.split('.')[-2] if filename.endswith('.npy') else keep
+            if version == keep:
+                continue
+            path = os.path.join(series_dir, filename)
+            try:
+                if version == previous or min_age == 0 or os.stat(path).st_mtime < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,78 @@
+"""
+Single Flight Module
+Per-key call coalescing: while a call for a key is running, concurrent calls
+for the same key wait for its result instead of repeating the work
+"""
+
+import threading
+from typing import Callable, Dict, Hashable
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time and shares its outcome with waiters"""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._executed = 0
+        self._shared = 0
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs):
+        """
+        Call fn(*args, **kwargs), or wait for an identical call already in flight
+
+        Args:
+            key: Identity of the work; calls with equal keys are coalesced
+            fn: Function doing the work
+            *args, **kwargs: Passed to fn by the call that runs it
+
+        Returns:
+            The result of the call that ran; if it raised, every waiter
+            raises the same exception
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._executed += 1
+            else:
+                call.waiters += 1
+                self._shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result
+
+    def stats(self) -> Dict[str, int]:
+        """Calls executed, calls that waited on another, and keys in flight"""
+        with self._lock:
+            return {
+                'executed': self._executed,
+                'shared': self._shared,
+                'in_flight': len(self._calls)
+            }
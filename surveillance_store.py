@@ -0,0 +1,491 @@
+"""
+Surveillance Store Module
+Local columnar store of normalized IDSP weekly surveillance rows with a
+per-(state, week) checkpoint, the incremental job that fills it, and a
+two-tier cache of weekly API responses
+"""
+
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from cache import TTLCache
+
+try:
+    import fcntl
+except ImportError:  # not on Windows; the store is then safe within one process only
+    fcntl = None
+
+# Normalized row layout; string columns are held as categoricals in memory.
+# 'partition' is the state the week was requested for, 'state' the state a
+# row reports (they differ for national requests)
+COLUMNS = {
+    'partition': str,
+    'state': str,
+    'district': str,
+    'disease': str,
+    'year': np.int16,
+    'week': np.int8,
+    'cases': np.int32,
+    'deaths': np.int32,
+    'alert_level': str,
+    'trend': str
+}
+STRING_COLUMNS = [name for name, dtype in COLUMNS.items() if dtype is str]
+
+
+def current_epi_week() -> Tuple[int, int]:
+    """(ISO year, ISO week) of today"""
+    iso = datetime.now().isocalendar()
+    return iso[0], iso[1]
+
+
+def week_is_final(year: int, week: int, has_data: bool = True) -> bool:
+    """
+    Whether an epi-week's data can be kept for good
+
+    Args:
+        year: ISO year of the week
+        week: ISO week
+        has_data: Whether the response for the week had any records; an
+            empty week may simply not be published yet
+
+    Returns:
+        bool: True for weeks before the current one that records were
+            returned for; only the current week (and unpublished weeks)
+            stay open
+    """
+    return has_data and (year, week) < current_epi_week()
+
+
+def previous_epi_weeks(count: int, year: int = None, week: int = None) -> List[Tuple[int, int]]:
+    """The given (default: current) epi-week and the count - 1 before it, newest first"""
+    if year is None or week is None:
+        year, week = current_epi_week()
+    monday = date.fromisocalendar(year, week, 1)
+    weeks = []
+    for i in range(count):
+        iso = (monday - timedelta(weeks=i)).isocalendar()
+        weeks.append((iso[0], iso[1]))
+    return weeks
+
+
+def normalize_rows(week_data: Dict, state: str, year: int, week: int) -> List[Dict]:
+    """Flatten parsed IDSP surveillance data into store rows"""
+    partition = state or 'India'
+    rows = []
+    for entry in week_data.get('surveillance_data', []):
+        rows.append({
+            'partition': partition,
+            'state': entry.get('state') or partition,
+            'district': entry.get('district') or '',
+            'disease': entry.get('disease_name', ''),
+            'year': year,
+            'week': week,
+            'cases': int(entry.get('cases_reported') or 0),
+            'deaths': int(entry.get('deaths_reported') or 0),
+            'alert_level': entry.get('alert_level') or 'normal',
+            'trend': entry.get('trend') or 'stable'
+        })
+    return rows
+
+
+class SurveillanceStore:
+    """Weekly surveillance rows held as one columnar frame, optionally persisted"""
+
+    def __init__(self, store_dir: str = None):
+        """
+        Initialize the store
+
+        Args:
+            store_dir (str, optional): Directory holding the rows (NumPy .npz, one
+                array per column) and the checkpoints; in-memory only if omitted
+        """
+        self.store_dir = store_dir
+        self._frame = self._empty_frame()
+        # "state|year|week" -> {'fetched_at', 'rows', 'closed'}
+        self._checkpoints = {}
+        self._loaded = None
+        self._lock = threading.RLock()
+        self._ingest_lock = None
+
+        if self.store_dir:
+            os.makedirs(self.store_dir, exist_ok=True)
+            self._reload()
+
+    def checkpoint(self, state: str, year: int, week: int) -> Optional[Dict]:
+        """Checkpoint of a (state, week) partition, or None if it was never ingested"""
+        self._reload()
+        with self._lock:
+            checkpoint = self._checkpoints.get(self._partition(state, year, week))
+        return dict(checkpoint) if checkpoint else None
+
+    def is_closed(self, state: str, year: int, week: int) -> bool:
+        """Whether a partition was ingested after its week ended, so it is final"""
+        checkpoint = self.checkpoint(state, year, week)
+        return bool(checkpoint and checkpoint['closed'])
+
+    def write_weeks(self, partitions: List[Tuple[str, int, int, List[Dict]]]) -> None:
+        """
+        Replace the rows of (state, year, week) partitions and checkpoint them
+
+        Args:
+            partitions: (state, year, week, rows) tuples; rows as produced by
+                normalize_rows. A partition is marked closed (never re-fetched)
+                when it has rows and week_is_final holds at the time of writing.
+        """
+        if not partitions:
+            return
+
+        fetched_at = datetime.now().isoformat()
+
+        # The file lock makes reload-modify-save atomic across worker processes
+        with self._lock, self._file_lock('store.lock'):
+            self._reload()
+            frame = self._frame
+            replaced = pd.MultiIndex.from_arrays(
+                [frame['partition'].astype(str), frame['year'], frame['week']]
+            ).isin([(state, year, week) for state, year, week, _ in partitions])
+            new_rows = [row for _, _, _, rows in partitions for row in rows]
+
+            parts = [frame[~replaced]]
+            if new_rows:
+                parts.append(self._to_frame(new_rows))
+            self._frame = pd.concat(parts, ignore_index=True)
+            for column in STRING_COLUMNS:
+                self._frame[column] = self._frame[column].astype(str).astype('category')
+
+            for state, year, week, rows in partitions:
+                self._checkpoints[self._partition(state, year, week)] = {
+                    'fetched_at': fetched_at,
+                    'rows': len(rows),
+                    'closed': week_is_final(year, week, bool(rows))
+                }
+
+            self._save()
+
+    def claim_ingestion(self) -> bool:
+        """
+        Whether this process should run the ingestion job
+
+        The first process to claim it keeps the claim until it exits, so only
+        one of several workers sharing the store directory ingests.
+        """
+        if not self.store_dir or fcntl is None:
+            return True
+        if self._ingest_lock is not None:
+            return True
+
+        handle = open(os.path.join(self.store_dir, 'ingest.lock'), 'a')
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return False
+        self._ingest_lock = handle
+        return True
+
+    def read_week(self, state: str, year: int, week: int) -> Optional[List[Dict]]:
+        """Rows of one ingested partition, or None if it was never ingested"""
+        if self.checkpoint(state, year, week) is None:
+            return None
+        frame = self.query(states=[state], weeks=[(year, week)])
+        return frame.astype({column: str for column in STRING_COLUMNS}).to_dict('records')
+
+    def query(self, states: List[str] = None, weeks: List[Tuple[int, int]] = None,
+              diseases: List[str] = None) -> pd.DataFrame:
+        """
+        Select stored rows
+
+        Args:
+            states: Only rows of the partitions of these states
+            weeks: Only rows of these (year, week) pairs
+            diseases: Only rows of these diseases
+
+        Returns:
+            pd.DataFrame: Matching rows with the COLUMNS layout
+        """
+        self._reload()
+        with self._lock:
+            frame = self._frame
+
+        mask = np.ones(len(frame), dtype=bool)
+        if states is not None:
+            mask &= frame['partition'].isin(states).to_numpy()
+        if diseases is not None:
+            mask &= frame['disease'].isin(diseases).to_numpy()
+        if weeks is not None:
+            codes = frame['year'].to_numpy(dtype=np.int64) * 100 + frame['week'].to_numpy()
+            mask &= np.isin(codes, [year * 100 + week for year, week in weeks])
+        return frame[mask].reset_index(drop=True)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._frame)
+
+    @staticmethod
+    def _partition(state: str, year: int, week: int) -> str:
+        return f"{state}|{year}|{week}"
+
+    @staticmethod
+    def _empty_frame() -> pd.DataFrame:
+        return pd.DataFrame({
+            name: pd.Series(dtype='category' if dtype is str else dtype)
+            for name, dtype in COLUMNS.items()
+        })
+
+    @staticmethod
+    def _to_frame(rows: List[Dict]) -> pd.DataFrame:
+        frame = pd.DataFrame(rows, columns=list(COLUMNS))
+        return frame.astype({name: dtype for name, dtype in COLUMNS.items() if dtype is not str})
+
+    @contextmanager
+    def _file_lock(self, name: str):
+        if not self.store_dir or fcntl is None:
+            yield
+            return
+
+        with open(os.path.join(self.store_dir, name), 'a') as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _paths(self) -> Tuple[str, str]:
+        return (os.path.join(self.store_dir, 'surveillance.npz'),
+                os.path.join(self.store_dir, 'checkpoints.json'))
+
+    def _save(self) -> None:
+        if not self.store_dir:
+            return
+
+        rows_path, checkpoints_path = self._paths()
+        suffix = f"{os.getpid()}.{threading.get_ident()}.tmp"
+
+        # Rows first: a crash before the checkpoints are written only means the
+        # partitions are fetched again
+        with open(f"{rows_path}.{suffix}", 'wb') as f:
+            np.savez(f, **{
+                name: self._frame[name].to_numpy(dtype=str if dtype is str else dtype)
+                for name, dtype in COLUMNS.items()
+            })
+        os.replace(f"{rows_path}.{suffix}", rows_path)
+
+        with open(f"{checkpoints_path}.{suffix}", 'w') as f:
+            json.dump(self._checkpoints, f)
+        os.replace(f"{checkpoints_path}.{suffix}", checkpoints_path)
+        self._loaded = self._identity(checkpoints_path)
+
+    def _reload(self) -> None:
+        # Pick up partitions written by another process (e.g. the ingestion job)
+        if not self.store_dir:
+            return
+
+        rows_path, checkpoints_path = self._paths()
+        identity = self._identity(checkpoints_path)
+        if identity is None or identity == self._loaded:
+            return
+
+        with self._lock:
+            if identity == self._loaded:
+                return
+            try:
+                with open(checkpoints_path, 'r') as f:
+                    checkpoints = json.load(f)
+                with np.load(rows_path, allow_pickle=False) as data:
+                    frame = pd.DataFrame({name: data[name] for name in COLUMNS})
+                for column in STRING_COLUMNS:
+                    frame[column] = frame[column].astype('category')
+            except Exception as e:
+                print(f"Could not load surveillance store {self.store_dir}: {e}")
+                return
+
+            self._frame = frame
+            self._checkpoints = checkpoints
+            self._loaded = identity
+
+    @staticmethod
+    def _identity(path: str):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns)
+
+
+class SurveillanceIngestor:
+    """Pulls new IDSP epi-weeks into a SurveillanceStore, never re-fetching closed weeks"""
+
+    def __init__(self, service, store: SurveillanceStore, states: List[str],
+                 weeks_back: int = 8, interval: float = 6 * 3600):
+        """
+        Initialize the ingestor
+
+        Args:
+            service (IDSPDataService): Client used to fetch weekly data
+            store (SurveillanceStore): Store the rows are written to
+            states (list): States to ingest
+            weeks_back (int): Epi-weeks (including the current one) kept ingested
+            interval (float): Seconds between runs when started in the background
+        """
+        self.service = service
+        self.store = store
+        self.states = list(states)
+        self.weeks_back = weeks_back
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def pending(self) -> List[Tuple[str, int, int]]:
+        """(state, year, week) partitions that still have to be fetched"""
+        return [
+            (state, year, week)
+            for year, week in previous_epi_weeks(self.weeks_back)
+            for state in self.states
+            if not self.store.is_closed(state, year, week)
+        ]
+
+    def run(self) -> Dict[str, int]:
+        """
+        Fetch every pending partition and write them to the store in one batch
+
+        Returns:
+            dict: Numbers of partitions fetched, skipped (already closed) and failed
+        """
+        pending = self.pending()
+        partitions = []
+        failed = 0
+
+        for state, year, week in pending:
+            try:
+                week_data = self.service.fetch_weekly_surveillance(state=state, week=week, year=year)
+                partitions.append((state, year, week, normalize_rows(week_data, state, year, week)))
+            except Exception as e:
+                print(f"IDSP ingestion error for {state} {year}-W{week}: {e}")
+                failed += 1
+
+        self.store.write_weeks(partitions)
+
+        return {
+            'fetched': len(partitions),
+            'skipped': self.weeks_back * len(self.states) - len(pending),
+            'failed': failed
+        }
+
+    def start(self) -> None:
+        """Run in a background daemon thread every interval seconds"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name='idsp-ingestor', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def _run(self) -> None:
+        # Every worker starts an ingestor; the one holding the store's claim
+        # ingests, the others take over if it exits
+        while not self._stopped.is_set():
+            if self.store.claim_ingestion():
+                self.run()
+            self._stopped.wait(self.interval)
+
+
+class SurveillanceCache:
+    """Weekly surveillance responses: final weeks kept for good, recent weeks briefly"""
+
+    def __init__(self, cache_dir: str = None, open_ttl: float = 900, max_closed_in_memory: int = 1024):
+        """
+        Initialize the cache
+
+        Args:
+            cache_dir (str, optional): Directory closed weeks are persisted in, so
+                they survive restarts; memory only if omitted
+            open_ttl (float): Seconds a response for a still-open week is reused
+            max_closed_in_memory (int): Closed weeks held in memory (LRU); older
+                ones are read back from cache_dir
+        """
+        self.cache_dir = cache_dir
+        self.closed = TTLCache(max_entries=max_closed_in_memory, ttl=None)
+        self.open = TTLCache(max_entries=1024, ttl=open_ttl)
+
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    def get(self, state: str, district: str, week: int, year: int) -> Optional[Dict]:
+        """Cached response for a request, or None"""
+        key = self._key(state, district, week, year)
+
+        week_data = self.closed.get(key)
+        if week_data is None:
+            week_data = self.open.get(key)
+        if week_data is None:
+            week_data = self._load(key)
+            if week_data is not None:
+                self.closed.set(key, week_data)
+        return week_data
+
+    def put(self, state: str, district: str, week: int, year: int, week_data: Dict,
+            closed: bool) -> None:
+        """
+        Cache a response
+
+        Args:
+            state, district, week, year: Request the response answers
+            week_data: Parsed response
+            closed: Whether the week's data is final (see week_is_final);
+                final weeks never expire
+        """
+        key = self._key(state, district, week, year)
+        if closed:
+            self.closed.set(key, week_data)
+            self.open.invalidate(key)
+            self._save(key, week_data)
+        else:
+            self.open.set(key, week_data)
+
+    def stats(self) -> Dict:
+        return {'closed': self.closed.stats(), 'open': self.open.stats()}
+
+    @staticmethod
+    def _key(state: str, district: str, week: int, year: int) -> Tuple:
+        return (state or 'India', district or '', int(year), int(week))
+
+    def _path(self, key: Tuple) -> str:
+        digest = hashlib.sha1('|'.join(map(str, key)).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+    def _load(self, key: Tuple) -> Optional[Dict]:
+        if not self.cache_dir:
+            return None
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Could not read cached surveillance week {path}: {e}")
+            return None
+
+    def _save(self, key: Tuple, week_data: Dict) -> None:
+        if not self.cache_dir:
+            return
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(week_data, f, default=str)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Could not cache surveillance week {path}: {e}")
@@ -0,0 +1,203 @@
+"""
+Tuning Module
+Per-series hyperparameter search for Prophet, scored with rolling-origin
+backtests across a process pool, with the winning parameters cached
+"""
+
+import json
+import logging
+import os
+import random
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import product
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from backtesting import backtest
+
+try:
+    import fcntl
+except ImportError:  # not on Windows; concurrent writers may then lose each other's results
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Parameters searched by default; everything else comes from the base params
+PARAM_GRID = {
+    'changepoint_prior_scale': [0.001, 0.01, 0.05, 0.1, 0.5],
+    'seasonality_prior_scale': [0.1, 1.0, 10.0],
+    'seasonality_mode': ['additive', 'multiplicative']
+}
+
+
+def candidate_params(base_params: Dict, grid: Dict = None, n_iter: int = None,
+                     seed: int = None) -> List[Dict]:
+    """
+    Build the parameter sets to evaluate
+
+    Args:
+        base_params (dict): Parameters shared by every candidate
+        grid (dict, optional): Values to search per parameter (default: PARAM_GRID)
+        n_iter (int, optional): Evaluate a random sample of this many grid
+            points instead of the full grid
+        seed (int, optional): Seed for the random sample
+
+    Returns:
+        list: Candidate parameter dicts
+    """
+    grid = grid or PARAM_GRID
+    names = list(grid)
+    points = list(product(*(grid[name] for name in names)))
+
+    if n_iter and n_iter < len(points):
+        points = random.Random(seed).sample(points, n_iter)
+
+    return [{**base_params, **dict(zip(names, point))} for point in points]
+
+
+def score_params(model_params: Dict, prophet_data: pd.DataFrame, metric: str = 'rmse',
+                 **backtest_kwargs) -> float:
+    """Mean backtest metric for one parameter set (folds are fitted inline)"""
+    _, summary = backtest(prophet_data, model_params, max_workers=1, **backtest_kwargs)
+    return float(summary.loc[metric, 'mean'])
+
+
+def search(prophet_data: pd.DataFrame, base_params: Dict, grid: Dict = None,
+           n_iter: int = None, metric: str = 'rmse', max_workers: int = None,
+           seed: int = None, **backtest_kwargs):
+    """
+    Search for the best Prophet parameters for a series
+
+    Args:
+        prophet_data (pd.DataFrame): Series with 'ds' and 'y' columns
+        base_params (dict): Parameters shared by every candidate
+        grid (dict, optional): Values to search per parameter (default: PARAM_GRID)
+        n_iter (int, optional): Random-search budget; the full grid if omitted
+        metric (str): Backtest metric to minimise ('mae', 'rmse' or 'mape')
+        max_workers (int, optional): Processes evaluating candidates in parallel
+        seed (int, optional): Seed for random search
+        **backtest_kwargs: horizon, period and initial passed to backtest()
+
+    Returns:
+        tuple: (best parameter dict, DataFrame of every candidate and its score)
+    """
+    candidates = candidate_params(base_params, grid, n_iter, seed)
+    logger.info(f"Evaluating {len(candidates)} parameter sets")
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(score_params, params, prophet_data, metric, **backtest_kwargs)
+            for params in candidates
+        ]
+        scores = []
+        for future in futures:
+            try:
+                scores.append(future.result())
+            except Exception as e:
+                logger.warning(f"Candidate evaluation failed: {e}")
+                scores.append(np.nan)
+
+    results = pd.DataFrame(candidates)
+    results[metric] = scores
+
+    if results[metric].isna().all():
+        raise ValueError("Every parameter candidate failed to evaluate")
+
+    best = candidates[int(results[metric].idxmin())]
+    return best, results.sort_values(metric).reset_index(drop=True)
+
+
+class TunedParamsStore:
+    """Winning parameters per (disease, location), optionally persisted to a JSON file"""
+
+    def __init__(self, path: str = None):
+        """
+        Initialize the store
+
+        Args:
+            path (str, optional): JSON file the tuned parameters are kept in
+        """
+        self.path = path
+        self._params = {}
+        self._mtime = None
+        self._lock = threading.RLock()
+        self._reload()
+
+    def get(self, disease: Optional[str], location: Optional[str]) -> Optional[Dict]:
+        """Return the tuned parameters for a series, or None if it was never tuned"""
+        self._reload()
+        with self._lock:
+            entry = self._params.get((disease or 'default', location or 'default'))
+        return dict(entry['params']) if entry else None
+
+    def put(self, disease: Optional[str], location: Optional[str], params: Dict,
+            metric: str, score: float) -> None:
+        """Record the winning parameters for a series, keeping those other workers saved"""
+        series = (disease or 'default', location or 'default')
+        entry = {
+            'series': list(series),
+            'params': params,
+            'metric': metric,
+            'score': score,
+            'tuned_at': datetime.now().isoformat()
+        }
+
+        with self._lock, self._file_lock():
+            self._reload()
+            self._params[series] = entry
+            if self.path:
+                self._write(list(self._params.values()))
+
+    def _reload(self) -> None:
+        """Merge in entries saved by other workers since the file was last read"""
+        if not self.path:
+            return
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return
+
+        with self._lock:
+            if mtime == self._mtime:
+                return
+            try:
+                with open(self.path, 'r') as f:
+                    stored = {tuple(entry['series']): entry for entry in json.load(f)}
+            except Exception as e:
+                logger.warning(f"Could not load tuned params from {self.path}: {e}")
+                return
+
+            # The most recent tuning of a series wins
+            for series, entry in stored.items():
+                current = self._params.get(series)
+                if current is None or entry['tuned_at'] >= current['tuned_at']:
+                    self._params[series] = entry
+            self._mtime = mtime
+
+    @contextmanager
+    def _file_lock(self):
+        if not self.path or fcntl is None:
+            yield
+            return
+
+        with open(f"{self.path}.lock", 'a') as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _write(self, entries: List[Dict]) -> None:
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(entries, f, default=str)
+            os.replace(tmp_path, self.path)
+            self._mtime = os.stat(self.path).st_mtime_ns
+        except Exception as e:
+            logger.warning(f"Could not persist tuned params to {self.path}: {e}")